@@ -0,0 +1,182 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from climatology import (
+    ClimatologyCalculator,
+    calendar_slot,
+    longest_run,
+    station_climatology,
+)
+
+
+def days_of(*dates):
+    return np.array(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def test_calendar_slot_gives_february_29_its_own_day():
+    """Test Feb 29 and Mar 1 keep the same slots in leap and common years."""
+    slots = calendar_slot(
+        days_of("2000-02-29", "2000-03-01", "2001-03-01", "2001-12-31")
+    )
+    assert slots.tolist() == [59, 60, 60, 365]
+
+
+def test_longest_run_breaks_on_gaps():
+    """Test runs of consecutive days, keeping the earliest on a tie."""
+    days = days_of("2000-01-01", "2000-01-02", "2000-01-04", "2000-01-05", "2000-01-06")
+    length, first, last = longest_run(days)
+    assert (length, first, last) == (3, days[2], days[4])
+    assert longest_run(days[:0]) == (0, None, None)
+
+
+def test_station_climatology():
+    """Test normals over the baseline only, anomalies, records and dry spells."""
+    dates = np.arange(np.datetime64("2000-01-01"), np.datetime64("2003-01-01"))
+    days = dates.astype(np.int64)
+    years = dates.astype("datetime64[Y]").astype(int) + 1970
+    # 10.0 and 0.0 degrees in the baseline, 5 degrees warmer in 2002
+    readings = np.column_stack(
+        [
+            np.select([years == 2000, years == 2001], [100, 0], 150),
+            np.full(len(days), -50),
+            np.where(dates == np.datetime64("2002-06-01"), 25, 0),
+        ]
+    ).astype(float)
+    readings[dates == np.datetime64("2001-03-01"), 0] = np.nan
+
+    result = station_climatology(
+        "ST001", days, readings, baseline=(2000, 2001), window=1
+    )
+
+    normals = result["normals"].set_index(["month", "day"])
+    assert len(normals) == 366
+    assert normals.loc[(1, 1), "max_temp_normal"] == pytest.approx(5.0)
+    assert normals.loc[(1, 1), "years"] == 2
+    # Only 2000 has a February 29, and 2001's Mar 1 reading is missing
+    assert normals.loc[(2, 29), "max_temp_normal"] == pytest.approx(10.0)
+    assert normals.loc[(3, 1), "max_temp_normal"] == pytest.approx(10.0)
+    assert normals.loc[(1, 1), "record_max_temp"] == pytest.approx(15.0)
+    assert normals.loc[(1, 1), "record_max_temp_year"] == 2002
+    # Every year ties the record low, set first in 2000
+    assert normals.loc[(1, 1), "record_min_temp_year"] == 2000
+
+    anomalies = result["anomalies"].set_index("year")
+    # Mar 1 is 5 degrees above its 2000-only normal, the other days 10
+    assert anomalies.loc[2002, "max_temp_anomaly"] == pytest.approx(
+        (364 * 10 + 5) / 365
+    )
+    assert anomalies.loc[2002, "min_temp_anomaly"] == pytest.approx(0.0)
+    assert anomalies.loc[2002, "precipitation_anomaly"] == pytest.approx(0.25)
+    assert anomalies.loc[2000, "days"] == 366
+
+    records = result["records"].iloc[0]
+    assert records["record_max_temp"] == pytest.approx(15.0)
+    assert records["record_max_temp_date"] == date(2002, 1, 1)
+    assert records["max_precipitation_date"] == date(2002, 6, 1)
+    assert records["longest_dry_spell"] == 365 + 366 + 151
+    assert records["dry_spell_start"] == date(2000, 1, 1)
+    assert records["dry_spell_end"] == date(2002, 5, 31)
+
+
+def test_normals_are_smoothed_across_the_new_year():
+    """Test the moving average wraps around from December to January."""
+    dates = np.arange(np.datetime64("2001-01-01"), np.datetime64("2002-01-01"))
+    readings = np.zeros((len(dates), 3))
+    readings[-1] = 30
+
+    result = station_climatology(
+        "ST001", dates.astype(np.int64), readings, (2001, 2001), 3
+    )
+
+    normals = result["normals"].set_index(["month", "day"])
+    assert normals.loc[(1, 1), "max_temp_normal"] == pytest.approx(1.0)
+    # December 30 averages Dec 29 and 30 with Dec 31; no Feb 29 in 2001
+    assert normals.loc[(12, 30), "max_temp_normal"] == pytest.approx(1.0)
+    assert normals.loc[(12, 28), "max_temp_normal"] == pytest.approx(0.0)
+
+
+@pytest.fixture
+def weather_db(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'weather.db'}"
+    dates = pd.date_range("2000-01-01", "2001-12-31")
+    pd.DataFrame(
+        {
+            "station_id": np.repeat(["ST001", "ST002"], len(dates)),
+            "date": np.tile(dates.date, 2),
+            "max_temp": np.r_[np.full(len(dates), 100), np.arange(len(dates))],
+            "min_temp": -10,
+            "precipitation": 0,
+        }
+    ).to_sql("weather_data", create_engine(db_url), index=False)
+    return db_url
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_calculate_and_store_climatology(weather_db, workers):
+    """Test the tables hold the same results serially and in parallel."""
+    calculator = ClimatologyCalculator(db_url=weather_db, baseline=(2000, 2001))
+    calculator.calculate_and_store_climatology(workers=workers)
+
+    engine = create_engine(weather_db)
+    records = pd.read_sql("SELECT * FROM weather_records ORDER BY station_id", engine)
+    assert records["station_id"].tolist() == ["ST001", "ST002"]
+    assert records["record_max_temp"].tolist() == [10.0, 73.0]
+    assert records["longest_dry_spell"].tolist() == [731, 731]
+    normals = pd.read_sql("SELECT * FROM weather_normals", engine)
+    assert len(normals) == 2 * 366
+    anomalies = pd.read_sql(
+        "SELECT * FROM weather_anomalies WHERE station_id = 'ST001'", engine
+    )
+    assert anomalies["max_temp_anomaly"].tolist() == pytest.approx([0.0, 0.0])
+    assert calculator.report["stations"] == 2
+
+
+def test_recompute_one_station_from_snapshot(weather_db, tmp_path):
+    """Test a station index snapshot as the source, replacing only its station."""
+    from station_index import write_snapshot
+
+    ClimatologyCalculator(db_url=weather_db).calculate_and_store_climatology()
+    engine = create_engine(weather_db)
+    index_dir = str(tmp_path / "index")
+    write_snapshot(engine, index_dir)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM weather_records WHERE station_id = 'ST002'")
+        conn.exec_driver_sql("UPDATE weather_records SET record_max_temp = 0")
+
+    calculator = ClimatologyCalculator(db_url=weather_db, index_dir=index_dir)
+    calculator.calculate_and_store_climatology(station_ids=["ST002"])
+
+    records = pd.read_sql("SELECT * FROM weather_records ORDER BY station_id", engine)
+    assert records["record_max_temp"].tolist() == [0.0, 73.0]
+
+
+def test_station_missing_from_snapshot_keeps_its_climatology(weather_db, tmp_path):
+    """Test a requested station the snapshot lacks is neither computed nor deleted."""
+    from station_index import write_snapshot
+
+    ClimatologyCalculator(db_url=weather_db).calculate_and_store_climatology()
+    engine = create_engine(weather_db)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM weather_data WHERE station_id = 'ST002'")
+    index_dir = str(tmp_path / "index")
+    write_snapshot(engine, index_dir)
+
+    calculator = ClimatologyCalculator(db_url=weather_db, index_dir=index_dir)
+    calculator.calculate_and_store_climatology(station_ids=["ST002"])
+
+    records = pd.read_sql(
+        "SELECT station_id FROM weather_records ORDER BY station_id", engine
+    )
+    assert records["station_id"].tolist() == ["ST001", "ST002"]
+    normals = pd.read_sql(
+        "SELECT * FROM weather_normals WHERE station_id = 'ST002'", engine
+    )
+    assert len(normals) == 366
+
+
+def test_invalid_baseline_is_rejected():
+    with pytest.raises(ValueError):
+        ClimatologyCalculator(db_url="sqlite://", baseline=(2010, 2000))
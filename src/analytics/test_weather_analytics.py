@@ -1,5 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock
+from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
 import pandas as pd
 from weather_analytics import WeatherStatsCalculator 
@@ -73,10 +74,12 @@ def test_calculate_and_store_stats_success(calculator):
     })
 
     with patch.object(calculator, "fetch_weather_data", return_value=mock_df) as mock_fetch, \
-         patch.object(calculator, "store_weather_stats") as mock_store:
+         patch.object(calculator, "store_weather_stats") as mock_store, \
+         patch.object(calculator, "bump_cache_generation") as mock_bump:
         calculator.calculate_and_store_stats()
         mock_fetch.assert_called_once()
         mock_store.assert_called_once_with(mock_df)
+        mock_bump.assert_called_once()
 
 def test_calculate_and_store_stats_no_data(calculator):
     """Test calculate and store stats with no data."""
@@ -94,3 +97,112 @@ def test_calculate_and_store_stats_failure(calculator):
         with pytest.raises(Exception):
             calculator.calculate_and_store_stats()
         mock_fetch.assert_called_once()
+
+@pytest.fixture
+def sqlite_calculator(tmp_path):
+    """Fixture with a calculator on a SQLite database holding two stations."""
+    db_url = f"sqlite:///{tmp_path / 'weather.db'}"
+    engine = create_engine(db_url)
+    pd.DataFrame({
+        "station_id": ["ST001", "ST001", "ST001", "ST002"],
+        "date": pd.to_datetime(
+            ["2023-01-01", "2023-06-01", "2024-01-01", "2023-01-01"]
+        ).date,
+        "max_temp": [100, 200, 300, 50],
+        "min_temp": [0, 100, 200, -50],
+        "precipitation": [10, 20, 30, 40],
+    }).to_sql("weather_data", engine, index=False)
+    pd.DataFrame({"station_id": ["ST001"], "year": [2023]}).to_sql(
+        "weather_stats_dirty", engine, index=False
+    )
+    pd.DataFrame({
+        "station_id": ["ST001", "ST002"],
+        "year": [2023, 2023],
+        "avg_max_temp": [0.0, 5.0],
+        "avg_min_temp": [0.0, -5.0],
+        "total_precipitation": [0.0, 0.4],
+    }).to_sql("weather_stats", engine, index=False)
+    return WeatherStatsCalculator(db_url=db_url, stats_table="weather_stats")
+
+def test_calculate_and_store_stats_incremental(sqlite_calculator):
+    """Test only the dirty partition is recomputed, replaced and cleared."""
+    assert sqlite_calculator.calculate_and_store_stats(incremental=True) == 1
+
+    stats = pd.read_sql(
+        "SELECT * FROM weather_stats ORDER BY station_id", sqlite_calculator.engine
+    )
+    assert stats["station_id"].tolist() == ["ST001", "ST002"]
+    assert stats.iloc[0]["avg_max_temp"] == 15.0
+    assert stats.iloc[0]["avg_min_temp"] == 5.0
+    assert stats.iloc[0]["total_precipitation"] == 0.3
+    assert stats.iloc[1]["avg_max_temp"] == 5.0
+    assert sqlite_calculator.fetch_dirty_partitions() == []
+    assert sqlite_calculator.report["mode"] == "incremental"
+    report = sqlite_calculator.report
+    assert (report["partitions"], report["rows"]) == (1, 1)
+    assert set(sqlite_calculator.report["stages"]) == {"aggregate", "store"}
+
+def test_calculate_and_store_stats_incremental_nothing_dirty(sqlite_calculator):
+    """Test an incremental run without flagged partitions does nothing."""
+    sqlite_calculator.calculate_and_store_stats(incremental=True)
+
+    with patch.object(sqlite_calculator, "fetch_partition_stats") as mock_fetch:
+        assert sqlite_calculator.calculate_and_store_stats(incremental=True) == 0
+        mock_fetch.assert_not_called()
+
+def test_fetch_weather_data_parquet_matches_sql(sqlite_calculator, tmp_path):
+    """Test the Parquet backend gives the same aggregates as the SQL path."""
+    raw = pd.read_sql("SELECT * FROM weather_data", sqlite_calculator.engine)
+    raw.loc[3, "precipitation"] = None
+    raw.to_sql(
+        "weather_data", sqlite_calculator.engine, if_exists="replace", index=False
+    )
+    raw["date"] = pd.to_datetime(raw["date"])
+    raw.assign(year=raw["date"].dt.year).to_parquet(
+        tmp_path / "parquet", partition_cols=["station_id", "year"], index=False
+    )
+    parquet_calculator = WeatherStatsCalculator(
+        db_url=sqlite_calculator.db_url,
+        backend="parquet",
+        parquet_root=str(tmp_path / "parquet"),
+    )
+
+    with sqlite_calculator.engine.connect() as conn:
+        expected = sqlite_calculator.fetch_partition_stats(
+            conn, [("ST001", 2023), ("ST001", 2024), ("ST002", 2023)]
+        ).sort_values(["station_id", "year"], ignore_index=True)
+    result = parquet_calculator.fetch_weather_data()
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert pd.isna(result.iloc[2]["total_precipitation"])
+
+def test_fetch_weather_data_from_monthly_rollups(sqlite_calculator):
+    """Test yearly stats derived from the monthly rollups equal the daily aggregates."""
+    raw = pd.read_sql("SELECT * FROM weather_data", sqlite_calculator.engine)
+    raw.loc[3, "precipitation"] = None
+    raw.to_sql(
+        "weather_data", sqlite_calculator.engine, if_exists="replace", index=False
+    )
+    partitions = [("ST001", 2023), ("ST001", 2024), ("ST002", 2023)]
+    with sqlite_calculator.engine.connect() as conn:
+        expected = sqlite_calculator.fetch_partition_stats(conn, partitions)
+
+    date = pd.to_datetime(raw["date"])
+    grouped = raw.groupby(
+        [raw["station_id"], date.dt.year.rename("year"), date.dt.month.rename("month")]
+    )
+    pd.DataFrame({
+        "max_temp_sum": grouped["max_temp"].sum(),
+        "max_temp_count": grouped["max_temp"].count(),
+        "min_temp_sum": grouped["min_temp"].sum(),
+        "min_temp_count": grouped["min_temp"].count(),
+        "precipitation_sum": grouped["precipitation"].sum(),
+        "precipitation_count": grouped["precipitation"].count(),
+    }).reset_index().to_sql("weather_monthly", sqlite_calculator.engine, index=False)
+
+    assert sqlite_calculator.has_monthly_rollups()
+    result = sqlite_calculator.fetch_weather_data().sort_values(
+        ["station_id", "year"], ignore_index=True
+    )
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert pd.isna(result.iloc[2]["total_precipitation"])
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from yield_analytics import FEATURES, YieldCorrelationCalculator, correlate
+
+
+def test_correlate_matches_numpy():
+    """Test the vectorized fit against numpy per feature."""
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame(rng.normal(size=(30, 3)), columns=["a", "b", "c"])
+    target = pd.Series(2.0 * features["a"] + rng.normal(scale=0.1, size=30))
+
+    result = correlate(features, target).set_index("feature")
+    for column in features.columns:
+        slope, intercept = np.polyfit(features[column], target, 1)
+        assert result.loc[column, "r"] == pytest.approx(
+            np.corrcoef(features[column], target)[0, 1]
+        )
+        assert result.loc[column, "slope"] == pytest.approx(slope)
+        assert result.loc[column, "intercept"] == pytest.approx(intercept)
+    assert result.loc["a", "r_squared"] > 0.99
+
+
+def test_correlate_skips_missing_years_per_feature():
+    """Test a missing value only drops that year from its own feature."""
+    features = pd.DataFrame({"a": [1.0, 2.0, 3.0, np.nan], "b": [1.0, 2.0, 3.0, 4.0]})
+    target = pd.Series([2.0, 4.0, 6.0, 8.0])
+
+    result = correlate(features, target).set_index("feature")
+    assert result.loc["a", "n"] == 3
+    assert result.loc["b", "n"] == 4
+    assert result.loc["a", "slope"] == pytest.approx(2.0)
+    assert result.loc["b", "r"] == pytest.approx(1.0)
+
+
+def test_calculate_and_store_correlations(tmp_path):
+    """Test yearly aggregates across stations are joined with yield and stored."""
+    db_url = f"sqlite:///{tmp_path / 'weather.db'}"
+    engine = create_engine(db_url)
+    dates = ["2000-01-01", "2000-07-01", "2001-01-01", "2001-07-01", "2002-07-01"]
+    pd.DataFrame(
+        {
+            "station_id": ["ST001"] * 5 + ["ST002"] * 5,
+            "date": pd.to_datetime(dates * 2).date,
+            "max_temp": [0, 300, 10, 320, 340, 0, 100, 10, 120, 140],
+            "min_temp": [-100, 100, -90, 110, 120, -100, 100, -90, 110, 120],
+            "precipitation": [10, 20, 10, 40, 60, 30, 40, 30, 80, 100],
+        }
+    ).to_sql("weather_data", engine, index=False)
+    pd.DataFrame(
+        {"year": [2000, 2001, 2002, 2003], "yield_amount": [100, 150, 200, 250]}
+    ).to_sql("yield_data", engine, index=False)
+
+    YieldCorrelationCalculator(db_url=db_url).calculate_and_store_correlations()
+
+    yearly = pd.read_sql("SELECT * FROM yield_weather_yearly ORDER BY year", engine)
+    assert yearly["year"].tolist() == [2000, 2001, 2002]
+    first = yearly.iloc[0]
+    assert first["stations"] == 2
+    assert first["avg_max_temp"] == pytest.approx(10.0)
+    assert first["gs_avg_max_temp"] == pytest.approx(20.0)
+    assert first["total_precipitation"] == pytest.approx(0.5)
+    assert first["gs_precipitation"] == pytest.approx(0.3)
+
+    correlation = pd.read_sql("SELECT * FROM yield_correlation", engine)
+    assert sorted(correlation["feature"]) == sorted(FEATURES)
+    assert (correlation["n"] == 3).all()
+    generation = pd.read_sql("SELECT generation FROM cache_generation", engine)
+    assert generation["generation"].tolist() == [1]
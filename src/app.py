@@ -1,23 +1,88 @@
-from flask import Flask
+from decimal import Decimal
+import orjson
+from flask import Flask, current_app, make_response
 from flask_sqlalchemy import SQLAlchemy
-from flask_marshmallow import Marshmallow
 from flask_restx import Api
 
+# Tables created by the ingestion job rather than by the Flask models; the
+# migrations create them, but autogenerate must not try to drop them.
+BATCH_TABLES = {
+    "ingestion_checkpoint",
+    "ingestion_manifest",
+    "weather_quarantine",
+    "weather_stats_dirty",
+    "yield_data",
+}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    return not (type_ == "table" and name in BATCH_TABLES)
+
+
+def _json_default(obj):
+    # PostgreSQL NUMERIC aggregates
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+def output_json(data, code, headers=None):
+    """
+    flask-restx JSON representation encoded with orjson instead of the stdlib
+    encoder; indented in debug mode like flask-restx's own.
+    """
+    option = orjson.OPT_INDENT_2 if current_app.debug else 0
+    response = make_response(
+        orjson.dumps(data, default=_json_default, option=option) + b"\n", code
+    )
+    response.headers.extend(headers or {})
+    return response
+
+
 db = SQLAlchemy()
-ma = Marshmallow()
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object("config.Config")
 
+    from config import engine_options
+
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config))
+
+    # The engine connects on the first query; nothing is created on boot
     db.init_app(app)
-    ma.init_app(app)
+    if not app.config["LEAN_STARTUP"]:
+        # Alembic alone costs a tenth of a second to import
+        from flask_marshmallow import Marshmallow
+        from flask_migrate import Migrate
+
+        Marshmallow(app)
+        Migrate(app, db, include_object=include_object)
+
+    api = Api(app, doc="/swagger/" if app.config["SWAGGER_ENABLED"] else False)
+    api.representations["application/json"] = output_json
+
+    from cache import ResponseCache
+
+    app.extensions["response_cache"] = ResponseCache.from_config(app.config)
+
+    from station_index import StationIndex
+
+    app.extensions["station_index"] = StationIndex.from_config(app.config)
+
+    from metrics import Metrics
 
-    api = Api(app, doc="/swagger/")
+    metrics = Metrics.from_config(app.config)
+    metrics.instrument_app(app)
+    with app.app_context():
+        metrics.instrument_engine(db.engine)
+    app.extensions["metrics"] = metrics
 
     from routes.weather_routes import weather_bp
+    from routes.yield_routes import yield_bp
 
     api.add_namespace(weather_bp, path="/api/weather")
+    api.add_namespace(yield_bp, path="/api/yield")
 
     return app
@@ -0,0 +1,283 @@
+import asyncio
+import time
+from datetime import date as date_type
+from urllib.parse import parse_qs
+
+import orjson
+from flask import Config as FlaskConfig
+from sqlalchemy import select, tuple_
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from cache import ResponseCache
+from config import engine_options
+from controllers.stats_controller import STATS_ROW
+from controllers.weather_controller import (
+    WEATHER_ROW,
+    decode_cursor,
+    encode_cursor,
+    serialize_weather_data,
+)
+from models.cache_generation import CacheGeneration
+from models.weather_data import WeatherData
+from models.weather_stats import WeatherStats
+from station_index import StationIndex
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+PER_PAGE = 10
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def async_database_url(url: str) -> str:
+    """
+    :param url: Database URL as used by the Flask app
+    :return: The same database with its asyncio driver
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
+def int_arg(args: dict, name: str, default=None):
+    """
+    Same semantics as Flask's request.args.get(name, default, type=int).
+    """
+    try:
+        return int(args[name])
+    except (KeyError, ValueError):
+        return default
+
+
+class AsyncWeatherApi:
+    """
+    ASGI application serving the read endpoints of the weather API with async
+    handlers. Requests and responses match the Flask routes, including the
+    response cache and ETags, but a request waiting on the database holds
+    neither a thread nor a connection beyond its own queries.
+    """
+
+    def __init__(self, config):
+        """
+        :param config: Flask config or any mapping with the Config settings
+        """
+        self.engine = create_async_engine(
+            async_database_url(config["SQLALCHEMY_DATABASE_URI"]),
+            **engine_options(config, async_driver=True),
+        )
+        self.generation_poll = config.get("CACHE_GENERATION_POLL", 5)
+        self._generation = 0
+        self._generation_read_at = None
+        # The generation is refreshed asynchronously before each lookup
+        self.cache = ResponseCache.from_config(config)
+        self.cache.generation_source = lambda: self._generation
+        self.cache.generation_poll = 0
+        self.index = StationIndex.from_config(config)
+
+        self.routes = {
+            "/api/weather": self.weather,
+            "/api/weather/": self.weather,
+            "/api/weather/stats": self.weather_stats,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        head = scope["method"] == "HEAD"
+        handler = self.routes.get(scope["path"])
+        if handler is None:
+            await self.respond(send, 404, {"message": "Not Found"}, head=head)
+            return
+        if scope["method"] not in ("GET", "HEAD"):
+            await self.respond(send, 405, {"message": "Method Not Allowed"})
+            return
+
+        query_string = scope["query_string"].decode()
+        args = {
+            k: v[0] for k, v in parse_qs(query_string, keep_blank_values=True).items()
+        }
+        if_none_match = dict(scope["headers"]).get(b"if-none-match", b"").decode()
+        try:
+            namespace, params, compute = handler(args)
+            await self.refresh_generation()
+            key = self.cache.key(namespace, params)
+            headers = {"ETag": f'"{key}"'}
+            if f'"{key}"' in if_none_match or if_none_match.strip() == "*":
+                await self.respond(send, 304, None, headers)
+                return
+            # The backend may be Redis; keep its round trips off the event loop
+            payload = await asyncio.to_thread(self.cache.backend.get, key)
+            if payload is None:
+                payload = await compute()
+                await asyncio.to_thread(self.cache.backend.set, key, payload)
+        except HTTPError as e:
+            await self.respond(send, e.status, {"message": e.message}, head=head)
+            return
+        await self.respond(send, 200, payload, headers, head=head)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def respond(
+        self, send, status: int, payload, headers: dict = None, head: bool = False
+    ):
+        """
+        :param head: Answer a HEAD request: same headers as GET, empty body
+        """
+        body = b"" if payload is None else orjson.dumps(payload) + b"\n"
+        raw_headers = [
+            (k.lower().encode(), v.encode()) for k, v in (headers or {}).items()
+        ]
+        if payload is not None:
+            raw_headers += [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ]
+        await send(
+            {"type": "http.response.start", "status": status, "headers": raw_headers}
+        )
+        await send({"type": "http.response.body", "body": b"" if head else body})
+
+    async def refresh_generation(self):
+        now = time.monotonic()
+        if (
+            self._generation_read_at is not None
+            and now - self._generation_read_at < self.generation_poll
+        ):
+            return
+        try:
+            async with self.engine.connect() as conn:
+                generation = await conn.scalar(select(CacheGeneration.generation))
+        except SQLAlchemyError:
+            generation = 0
+        self._generation = generation or 0
+        self._generation_read_at = now
+
+    async def fetch_all(self, query):
+        async with self.engine.connect() as conn:
+            return (await conn.execute(query)).all()
+
+    def weather(self, args: dict):
+        """
+        GET /api/weather: page or cursor pagination by station_id and date.
+        :return: (cache namespace, cache params, coroutine function)
+        """
+        station_id = args.get("station_id")
+        page = int_arg(args, "page", 1)
+        try:
+            date = date_type.fromisoformat(args["date"]) if args.get("date") else None
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+        query = select(*WEATHER_ROW)
+        if station_id:
+            query = query.where(WeatherData.station_id == station_id)
+        if date:
+            query = query.where(WeatherData.date == date)
+
+        if "cursor" in args:
+            cursor = args["cursor"] or None
+            per_page = min(int_arg(args, "per_page", PER_PAGE), 1000)
+            if cursor:
+                try:
+                    after = decode_cursor(cursor)
+                except ValueError as e:
+                    raise HTTPError(400, str(e))
+                query = query.where(
+                    tuple_(WeatherData.station_id, WeatherData.date) > after
+                )
+            query = query.order_by(WeatherData.station_id, WeatherData.date).limit(
+                per_page + 1
+            )
+
+            async def compute_page():
+                rows = await self.fetch_all(query)
+                next_cursor = None
+                if len(rows) > per_page:
+                    rows = rows[:per_page]
+                    next_cursor = encode_cursor(*rows[-1][:2])
+                return {
+                    "items": [serialize_weather_data(d) for d in rows],
+                    "next_cursor": next_cursor,
+                }
+
+            params = {
+                "station_id": station_id,
+                "date": date,
+                "cursor": cursor,
+                "per_page": per_page,
+            }
+            return "weather_page", params, compute_page
+
+        async def compute():
+            if self.index is not None and station_id and date and page == 1:
+                row = self.index.lookup(station_id, date)
+                if row is not None:
+                    return [serialize_weather_data(row)]
+            rows = await self.fetch_all(self.paginate(query, page))
+            if not rows and page > 1:
+                raise HTTPError(404, "Not Found")
+            return [serialize_weather_data(d) for d in rows]
+
+        return (
+            "weather",
+            {"station_id": station_id, "date": date, "page": page},
+            compute,
+        )
+
+    def weather_stats(self, args: dict):
+        """
+        GET /api/weather/stats: yearly statistics by station_id and year.
+        :return: (cache namespace, cache params, coroutine function)
+        """
+        station_id = args.get("station_id")
+        year = int_arg(args, "year")
+        page = int_arg(args, "page", 1)
+
+        query = select(*(getattr(WeatherStats, name) for name in STATS_ROW))
+        if station_id:
+            query = query.where(WeatherStats.station_id == station_id)
+        if year:
+            query = query.where(WeatherStats.year == year)
+
+        async def compute():
+            rows = await self.fetch_all(self.paginate(query, page))
+            if not rows and page > 1:
+                raise HTTPError(404, "Not Found")
+            return [dict(zip(STATS_ROW, row)) for row in rows]
+
+        return "stats", {"station_id": station_id, "year": year, "page": page}, compute
+
+    @staticmethod
+    def paginate(query, page: int):
+        # Flask-SQLAlchemy's paginate answers 404 for pages below 1
+        if page < 1:
+            raise HTTPError(404, "Not Found")
+        return query.limit(PER_PAGE).offset((page - 1) * PER_PAGE)
+
+
+def create_asgi_app(config_object: str = "config.Config") -> AsyncWeatherApi:
+    config = FlaskConfig(".")
+    config.from_object(config_object)
+    return AsyncWeatherApi(config)
@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter, like a new Lambda or worker process
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+response = app.test_client().get("/api/weather/?page=1")
+served = time.perf_counter()
+print(json.dumps({
+    "status": response.status_code,
+    "import_seconds": imported - started,
+    "create_app_seconds": created - imported,
+    "first_request_seconds": served - created,
+    "modules": sorted(m for m in sys.modules if "." not in m),
+}))
+"""
+# Modules a lean start must not import
+HEAVY_MODULES = ("alembic", "flask_marshmallow", "flask_migrate", "numpy", "pandas")
+
+
+def create_schema(db_url: str):
+    """
+    Create the API's tables once, outside the measured processes.
+    """
+    env = {**os.environ, "DATABASE_URL": db_url}
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from app import create_app, db\n"
+            "app = create_app()\n"
+            "with app.app_context():\n"
+            "    db.create_all()\n",
+        ],
+        cwd=SRC,
+        env=env,
+        check=True,
+    )
+
+
+def cold_start(db_url: str, lean: bool = True) -> dict:
+    """
+    Start a fresh interpreter, import and create the app and serve one
+    /api/weather request.
+    :return: Seconds per phase, total including interpreter start, status and
+        the heavy modules that were imported
+    """
+    env = {**os.environ, "DATABASE_URL": db_url, "LEAN_STARTUP": str(lean).lower()}
+    env.pop("SWAGGER_ENABLED", None)
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=SRC, env=env, check=True, capture_output=True
+    ).stdout
+    total = time.perf_counter() - started
+    result = json.loads(output.decode().strip().splitlines()[-1])
+    modules = result.pop("modules")
+    result["total_seconds"] = total
+    result["heavy_modules"] = [m for m in HEAVY_MODULES if m in modules]
+    return result
+
+
+def measure(db_url: str, lean: bool, repeat: int) -> dict:
+    runs = [cold_start(db_url, lean) for _ in range(repeat)]
+    phases = [
+        "import_seconds",
+        "create_app_seconds",
+        "first_request_seconds",
+        "total_seconds",
+    ]
+    return {
+        **{
+            phase: round(statistics.median(r[phase] for r in runs), 3)
+            for phase in phases
+        },
+        "best_total_seconds": round(min(r["total_seconds"] for r in runs), 3),
+        "status": runs[-1]["status"],
+        "heavy_modules": runs[-1]["heavy_modules"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cold start of the Flask app: import, create_app and first request."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=1.0,
+        help="Seconds the median lean cold start must stay under",
+    )
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="weather-cold-start-")
+    db_url = f"sqlite:///{os.path.join(workdir, 'api.db')}"
+    create_schema(db_url)
+    results = {
+        "full": measure(db_url, lean=False, repeat=args.repeat),
+        "lean": measure(db_url, lean=True, repeat=args.repeat),
+        "budget_seconds": args.budget,
+    }
+    print(json.dumps(results, indent=2))
+    lean = results["lean"]
+    if (
+        lean["total_seconds"] > args.budget
+        or lean["heavy_modules"]
+        or lean["status"] != 200
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC)
+
+
+def legacy_page(WeatherData, page, per_page):
+    """
+    The read path before the lean one: full ORM objects, per-field Python
+    scaling and the stdlib encoder. Kept here as the baseline only.
+    """
+    data = WeatherData.query.paginate(page=page, per_page=per_page).items
+    payload = [
+        {
+            "station_id": d.station_id,
+            "date": d.date.isoformat(),
+            "max_temp": d.max_temp / 10 if d.max_temp else None,
+            "min_temp": d.min_temp / 10 if d.min_temp else None,
+            "precipitation": d.precipitation / 10 if d.precipitation else None,
+        }
+        for d in data
+    ]
+    return json.dumps(payload).encode()
+
+
+def lean_page(page, per_page):
+    import orjson
+    from controllers.weather_controller import get_weather_data
+
+    return orjson.dumps(get_weather_data(page=page, per_page=per_page))
+
+
+def measure(fn, pages: int, per_page: int, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for page in range(1, pages + 1):
+            fn(page, per_page)
+        best = min(best, time.perf_counter() - started)
+    rows = pages * per_page
+    return {
+        "rows": rows,
+        "seconds": round(best, 4),
+        "rows_per_second": round(rows / best, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rows/second of the legacy and lean /api/weather read paths."
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--per-page", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    db_path = os.path.join(
+        tempfile.mkdtemp(prefix="weather-serialization-"), "bench.db"
+    )
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    from app import create_app, db
+    from models.weather_data import WeatherData
+
+    rng = np.random.default_rng(0)
+    ids = np.arange(args.rows)
+    readings = rng.integers(-300, 400, size=(args.rows, 3))
+    readings[:, 2] = np.abs(readings[:, 2])
+    missing = rng.random(readings.shape) < 0.02
+    df = pd.DataFrame(
+        {
+            "id": ids + 1,
+            "station_id": [f"ST{i:03d}" for i in ids % 100],
+            "date": (
+                pd.Timestamp("1985-01-01") + pd.to_timedelta(ids // 100, "D")
+            ).date,
+        }
+    )
+    for i, column in enumerate(["max_temp", "min_temp", "precipitation"]):
+        df[column] = pd.array(
+            np.where(missing[:, i], None, readings[:, i]), dtype="Int64"
+        )
+    df.to_sql("weather_data", f"sqlite:///{db_path}", index=False)
+
+    app = create_app()
+    pages = args.rows // args.per_page
+    with app.app_context():
+        results = {
+            "legacy": measure(
+                lambda page, per_page: legacy_page(WeatherData, page, per_page),
+                pages,
+                args.per_page,
+                args.repeat,
+            ),
+            "lean": measure(lean_page, pages, args.per_page, args.repeat),
+        }
+        db.session.remove()
+    results["speedup"] = round(
+        results["lean"]["rows_per_second"] / results["legacy"]["rows_per_second"], 2
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [SRC, os.path.join(SRC, "ingestion"), os.path.join(SRC, "analytics")]
+
+from data_ingestion import WeatherDataIngestor, parse_weather_file  # noqa: E402
+from weather_analytics import WeatherStatsCalculator  # noqa: E402
+from climatology import ClimatologyCalculator  # noqa: E402
+from synthetic_data import WX_DATA, generate_stations  # noqa: E402
+
+# Metrics compared across runs, and whether a larger value is an improvement
+COMPARED_METRICS = {
+    "parse": {"rows_per_second": True, "mb_per_second": True},
+    "ingest": {"elapsed_seconds": False, "rows_per_second": True},
+    "stats": {"elapsed_seconds": False},
+    "climatology": {"elapsed_seconds": False},
+    "api_weather": {"p50_ms": False, "p95_ms": False, "p99_ms": False},
+    "api_stats": {"p50_ms": False, "p95_ms": False, "p99_ms": False},
+}
+
+
+def bench_parse(files: list) -> dict:
+    """
+    Parsing throughput of read_weather_file's parser, without any database.
+    """
+    rows = 0
+    size = sum(os.path.getsize(f) for f in files)
+    started = time.perf_counter()
+    for file_path in files:
+        rows += len(parse_weather_file(file_path))
+    elapsed = time.perf_counter() - started
+    return {
+        "files": len(files),
+        "rows": rows,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1),
+        "mb_per_second": round(size / elapsed / 2**20, 2),
+    }
+
+
+def bench_ingest(db_url: str, data_dir: str, workers: int, writers: int) -> dict:
+    """
+    End-to-end process_directory wall time into an empty database.
+    """
+    ingestor = WeatherDataIngestor(db_url=db_url, table_name="weather_data")
+    return ingestor.process_directory(data_dir, workers=workers, writers=writers)
+
+
+def bench_stats(db_url: str) -> dict:
+    """
+    Full calculate_and_store_stats duration after a load, derived from the
+    monthly rollups that ingestion maintains.
+    """
+    calculator = WeatherStatsCalculator(db_url=db_url)
+    started = time.perf_counter()
+    calculator.calculate_and_store_stats()
+    return {
+        "mode": "monthly" if calculator.has_monthly_rollups() else "daily",
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def bench_climatology(db_url: str, workers: int) -> dict:
+    """
+    Full calculate_and_store_climatology duration over the daily records,
+    to compare with the stats job.
+    """
+    calculator = ClimatologyCalculator(db_url=db_url)
+    calculator.calculate_and_store_climatology(workers=workers)
+    return {
+        "stations": calculator.report["stations"],
+        "elapsed_seconds": calculator.report["elapsed_seconds"],
+        "stages": calculator.report["stages"],
+    }
+
+
+def latency_summary(latencies: list, errors: int, elapsed: float) -> dict:
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+    }
+
+
+def run_load(base_url: str, paths: list, concurrency: int) -> dict:
+    """
+    Issue the requests from a pool of concurrent clients and collect latencies.
+    """
+
+    def fetch(path):
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(base_url + path) as response:
+                response.read()
+            return time.perf_counter() - started, True
+        except urllib.error.URLError:
+            return time.perf_counter() - started, False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, paths))
+    elapsed = time.perf_counter() - started
+    return latency_summary(
+        [latency for latency, ok in results if ok],
+        sum(1 for _, ok in results if not ok),
+        elapsed,
+    )
+
+
+def bench_api(
+    db_url: str, requests: int, concurrency: int, cache: bool, seed: int
+) -> dict:
+    """
+    p50/p95/p99 latency of both endpoints served by a threaded WSGI server,
+    for random station/date and station/year lookups present in the data.
+    """
+    os.environ["DATABASE_URL"] = db_url
+    from werkzeug.serving import make_server
+    from app import create_app
+    from cache import InProcessBackend
+
+    app = create_app()
+    if not cache:
+        app.extensions["response_cache"].backend = InProcessBackend(ttl=0)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/api/weather"
+
+    engine = create_engine(db_url)
+    rng = random.Random(seed)
+    days = pd.read_sql(
+        "SELECT station_id, date FROM weather_data ORDER BY RANDOM() LIMIT 1000", engine
+    )
+    years = pd.read_sql(
+        "SELECT station_id, year FROM weather_stats ORDER BY RANDOM() LIMIT 1000",
+        engine,
+    )
+    try:
+        return {
+            "api_weather": run_load(
+                base_url,
+                [
+                    f"/?station_id={r.station_id}&date={str(r.date)[:10]}"
+                    for r in (
+                        days.iloc[rng.randrange(len(days))] for _ in range(requests)
+                    )
+                ],
+                concurrency,
+            ),
+            "api_stats": run_load(
+                base_url,
+                [
+                    f"/stats?station_id={r.station_id}&year={int(r.year)}"
+                    for r in (
+                        years.iloc[rng.randrange(len(years))] for _ in range(requests)
+                    )
+                ],
+                concurrency,
+            ),
+        }
+    finally:
+        server.shutdown()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=SRC,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(previous: dict, current: dict):
+    """
+    Print the change of every compared metric between two result files.
+    """
+    print(
+        f"{'metric':<32}{previous['meta']['commit']:>12}"
+        f"{current['meta']['commit']:>12}{'change':>10}"
+    )
+    for section, metrics in COMPARED_METRICS.items():
+        for metric, higher_is_better in metrics.items():
+            old = previous["results"].get(section, {}).get(metric)
+            new = current["results"].get(section, {}).get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            better = (change > 0) == higher_is_better
+            marker = "" if abs(change) < 5 else (" +" if better else " -")
+            print(
+                f"{section + '.' + metric:<32}{old:>12}{new:>12}{change:>9.1f}%{marker}"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark ingestion, stats and the API."
+    )
+    parser.add_argument(
+        "--db-url", help="Database to benchmark; a throwaway SQLite file by default"
+    )
+    parser.add_argument("--data-dir", default=WX_DATA)
+    parser.add_argument(
+        "--stations",
+        type=int,
+        help="Generate this many synthetic stations instead of using --data-dir",
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Disable the API response cache"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    workdir = tempfile.mkdtemp(prefix="weather-bench-")
+    db_url = args.db_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    data_dir = args.data_dir
+    if args.stations:
+        data_dir = os.path.join(workdir, "wx_data")
+        generate_stations(data_dir, args.stations, args.data_dir, args.seed)
+    files = sorted(
+        os.path.join(data_dir, f) for f in os.listdir(data_dir) if f.endswith(".txt")
+    )
+
+    results = {"parse": bench_parse(files)}
+    results["ingest"] = bench_ingest(db_url, data_dir, args.workers, args.writers)
+    results["stats"] = bench_stats(db_url)
+    results["climatology"] = bench_climatology(db_url, args.workers)
+    results.update(
+        bench_api(db_url, args.requests, args.concurrency, not args.no_cache, args.seed)
+    )
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": create_engine(db_url).dialect.name,
+            "stations": len(files),
+            "workers": args.workers,
+            "writers": args.writers,
+            "concurrency": args.concurrency,
+            "cache": not args.no_cache,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
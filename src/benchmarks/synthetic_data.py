@@ -0,0 +1,62 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+MISSING = -9999
+WX_DATA = os.path.join(os.path.dirname(__file__), "..", "..", "wx_data")
+
+
+def generate_stations(
+    output_dir: str, stations: int, source_dir: str = WX_DATA, seed: int = 0
+) -> list:
+    """
+    Scale the bundled wx_data up to any number of stations. Each synthetic
+    station replays a real station file with small random perturbations of
+    the readings, so value distributions and missing-value rates stay
+    realistic. Output is deterministic for a given seed.
+    :param output_dir: Directory to write the station files to
+    :param stations: Number of station files to generate
+    :param source_dir: Directory with the template station files
+    :param seed: Random seed
+    :return: Paths of the generated files
+    """
+    templates = sorted(
+        os.path.join(source_dir, f)
+        for f in os.listdir(source_dir)
+        if f.endswith(".txt")
+    )
+    if not templates:
+        raise ValueError(f"No template station files in {source_dir}")
+    os.makedirs(output_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    paths = []
+    for i in range(stations):
+        raw = pd.read_csv(
+            templates[i % len(templates)], sep="\t", header=None
+        ).to_numpy()
+        readings = raw[:, 1:]
+        noise = rng.integers(-15, 16, size=readings.shape)
+        noise[:, 2] = np.maximum(noise[:, 2], -readings[:, 2])  # no negative rain
+        raw[:, 1:] = np.where(readings == MISSING, MISSING, readings + noise)
+
+        path = os.path.join(output_dir, f"SYN{i:08d}.txt")
+        np.savetxt(path, raw, fmt=["%d", "%5d", "%5d", "%5d"], delimiter="\t")
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic station files.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--stations", type=int, default=1000)
+    parser.add_argument("--source-dir", default=WX_DATA)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_stations(
+        args.output_dir, args.stations, args.source_dir, args.seed
+    )
+    print(f"Wrote {len(paths)} station files to {args.output_dir}")
@@ -0,0 +1,19 @@
+import os
+
+from bench_cold_start import cold_start, create_schema
+
+# Seconds; a Lambda cold start should stay well under this
+BUDGET = float(os.getenv("COLD_START_BUDGET", "1.0"))
+
+
+def test_lean_cold_start_stays_within_budget(tmp_path):
+    """Test a lean start skips the heavy modules and serves within the budget."""
+    db_url = f"sqlite:///{tmp_path / 'api.db'}"
+    create_schema(db_url)
+
+    runs = [cold_start(db_url, lean=True) for _ in range(3)]
+
+    assert runs[0]["status"] == 200
+    assert runs[0]["heavy_modules"] == []
+    # Best of three, so one slow start on a busy machine does not fail the check
+    assert min(r["total_seconds"] for r in runs) < BUDGET
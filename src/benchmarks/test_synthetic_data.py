@@ -0,0 +1,27 @@
+import pandas as pd
+from synthetic_data import generate_stations
+
+
+def test_generate_stations_scales_templates(tmp_path):
+    """Test synthetic stations replay the templates with bounded noise."""
+    template_dir = tmp_path / "templates"
+    template_dir.mkdir()
+    (template_dir / "USC00000001.txt").write_text(
+        "19850101\t  -22\t -128\t   94\n19850102\t-9999\t -217\t    0\n"
+    )
+
+    paths = generate_stations(str(tmp_path / "out"), 3, str(template_dir), seed=1)
+
+    assert [p.rsplit("/", 1)[1] for p in paths] == [
+        "SYN00000000.txt",
+        "SYN00000001.txt",
+        "SYN00000002.txt",
+    ]
+    df = pd.read_csv(paths[0], sep="\t", header=None)
+    assert df[0].tolist() == [19850101, 19850102]
+    assert df.iloc[1, 1] == -9999
+    assert abs(df.iloc[0, 1] - -22) <= 15
+    assert (df[3] >= 0).all()
+    assert paths == generate_stations(
+        str(tmp_path / "out"), 3, str(template_dir), seed=1
+    )
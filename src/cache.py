@@ -0,0 +1,189 @@
+import hashlib
+import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, current_app, request
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from models.cache_generation import CacheGeneration
+
+
+class InProcessBackend:
+    """
+    LRU cache with a per-entry TTL, local to one worker process.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300, clock=time.monotonic):
+        """
+        :param max_entries: Entries kept before the least recently used is evicted
+        :param ttl: Seconds an entry stays valid
+        :param clock: Time source, overridable in tests
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """
+    Cache shared by every worker, stored in Redis (or any client exposing
+    get and setex). Redis evicts with its own LRU policy; entries expire
+    after ttl seconds.
+    """
+
+    def __init__(self, client, ttl: float = 300, prefix: str = "weather-api:"):
+        """
+        :param client: Redis client
+        :param ttl: Seconds an entry stays valid
+        :param prefix: Key prefix, so the cache can share a Redis database
+        """
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str):
+        value = self.client.get(self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key: str, value):
+        self.client.setex(self.prefix + key, int(self.ttl), pickle.dumps(value))
+
+
+class ResponseCache:
+    """
+    Caches API payloads by normalized query parameters. Keys include the data
+    generation that ingestion and the stats job bump whenever they write, so
+    a new generation invalidates every earlier entry at once.
+    """
+
+    def __init__(
+        self,
+        backend,
+        generation_source,
+        generation_poll: float = 5,
+        clock=time.monotonic,
+    ):
+        """
+        :param backend: InProcessBackend, RedisBackend or compatible object
+        :param generation_source: Callable returning the current data generation
+        :param generation_poll: Seconds the last read generation is trusted
+        :param clock: Time source, overridable in tests
+        """
+        self.backend = backend
+        self.generation_source = generation_source
+        self.generation_poll = generation_poll
+        self.clock = clock
+        self._generation = None
+        self._generation_read_at = None
+        self._lock = threading.Lock()
+
+    def generation(self) -> int:
+        with self._lock:
+            now = self.clock()
+            if (
+                self._generation_read_at is None
+                or now - self._generation_read_at >= self.generation_poll
+            ):
+                self._generation = self.generation_source()
+                self._generation_read_at = now
+            return self._generation
+
+    def key(self, namespace: str, params: dict) -> str:
+        normalized = {k: v for k, v in sorted(params.items()) if v is not None}
+        raw = json.dumps([namespace, self.generation(), normalized], default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get_or_compute(self, namespace: str, params: dict, compute):
+        """
+        :param namespace: Endpoint the payload belongs to
+        :param params: Query parameters the payload depends on
+        :param compute: Callable producing the payload on a miss
+        :return: (payload, etag)
+        """
+        key = self.key(namespace, params)
+        return self.lookup(key, compute), f'"{key}"'
+
+    def lookup(self, key: str, compute):
+        payload = self.backend.get(key)
+        if payload is None:
+            payload = compute()
+            self.backend.set(key, payload)
+        return payload
+
+    @classmethod
+    def from_config(cls, config):
+        if config.get("CACHE_BACKEND", "memory") == "redis":
+            import redis
+
+            backend = RedisBackend(
+                redis.Redis.from_url(config["CACHE_REDIS_URL"]),
+                ttl=config.get("CACHE_TTL", 300),
+            )
+        else:
+            backend = InProcessBackend(
+                max_entries=config.get("CACHE_MAX_ENTRIES", 1024),
+                ttl=config.get("CACHE_TTL", 300),
+            )
+        return cls(
+            backend,
+            read_data_generation,
+            generation_poll=config.get("CACHE_GENERATION_POLL", 5),
+        )
+
+
+def read_data_generation() -> int:
+    """
+    :return: Generation from the cache_generation table, 0 if it is missing
+    """
+    try:
+        generation = db.session.query(CacheGeneration.generation).scalar()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return 0
+    return generation or 0
+
+
+def cached_response(namespace: str, params: dict, compute):
+    """
+    Serve a payload through the app's response cache with an ETag, answering
+    304 Not Modified when the client already holds the current payload.
+    :param namespace: Endpoint the payload belongs to
+    :param params: Query parameters the payload depends on
+    :param compute: Callable producing the payload on a miss
+    :return: flask-restx response tuple or a 304 Response
+    """
+    cache = current_app.extensions["response_cache"]
+    key = cache.key(namespace, params)
+    headers = {"ETag": f'"{key}"'}
+    if request.if_none_match.contains(key):
+        return Response(status=304, headers=headers)
+    return cache.lookup(key, compute), 200, headers
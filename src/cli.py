@@ -0,0 +1,390 @@
+import argparse
+import logging
+import os
+import sys
+from typing import Optional
+
+from dotenv import load_dotenv
+
+SRC = os.path.dirname(os.path.abspath(__file__))
+# The batch jobs import their siblings flat, as when run as scripts
+sys.path[:0] = [os.path.join(SRC, d) for d in ("ingestion", "analytics", "benchmarks")]
+
+from pipeline import Pipeline  # noqa: E402
+
+logger = logging.getLogger("cli")
+
+
+def build_ingestor(args):
+    from data_ingestion import WeatherDataIngestor
+
+    return WeatherDataIngestor(
+        db_url=args.db_url,
+        table_name=args.table,
+        backend=args.backend,
+        parquet_root=args.parquet_root,
+        validation_rules=(
+            None
+            if args.validation_rules is None
+            else [r for r in args.validation_rules.split(",") if r and r != "none"]
+        ),
+        retries=args.retries,
+        retry_backoff=args.retry_backoff,
+    )
+
+
+def build_calculator(args):
+    from weather_analytics import WeatherStatsCalculator
+
+    return WeatherStatsCalculator(
+        db_url=args.db_url,
+        stats_table=args.stats_table,
+        backend=args.backend,
+        parquet_root=args.parquet_root,
+    )
+
+
+def ingest(ingestor, args, on_loaded=None) -> dict:
+    """
+    :return: Ingestion summary
+    :raises RuntimeError: If the source has no files to load
+    """
+    from sources import open_source
+
+    summary = ingestor.process_source(
+        open_source(args.source, ingestor.file_extension),
+        workers=args.workers,
+        writers=args.writers,
+        chunksize=args.chunksize,
+        resume=args.resume,
+        on_loaded=on_loaded,
+    )
+    if summary is None:
+        raise RuntimeError(f"No files to ingest in {args.source}")
+    return summary
+
+
+def publish_index(args, engine, summary: Optional[dict] = None) -> Optional[str]:
+    """
+    Publish a new station index snapshot unless the run loaded nothing and
+    a snapshot already exists.
+    :return: Name of the new snapshot, or None
+    """
+    from station_index import CURRENT, write_snapshot
+
+    if (
+        summary is not None
+        and not summary["files_processed"]
+        and os.path.exists(os.path.join(args.index_dir, CURRENT))
+    ):
+        logger.info("No files loaded, the station index is up to date.")
+        return None
+    name = write_snapshot(engine, args.index_dir, args.table)
+    logger.info(f"Published station index snapshot {name} to {args.index_dir}.")
+    return name
+
+
+def save_report(args, job: str, report: dict):
+    if args.run_report_dir:
+        from jobs import write_run_report
+
+        write_run_report(args.run_report_dir, job, report)
+
+
+def run_ingest(args) -> int:
+    ingestor = build_ingestor(args)
+    summary = ingest(ingestor, args)
+    save_report(args, "ingestion", summary)
+    if args.index_dir and ingestor.backend == "sql":
+        publish_index(args, ingestor.engine, summary)
+    # Failed files must not look like a successful run to the scheduler
+    return 1 if summary["files_failed"] else 0
+
+
+def run_compute_stats(args) -> int:
+    calculator = build_calculator(args)
+    calculator.calculate_and_store_stats(incremental=args.incremental)
+    save_report(args, "weather_stats", calculator.report)
+    return 0
+
+
+def run_climatology(args) -> int:
+    from climatology import ClimatologyCalculator
+
+    calculator = ClimatologyCalculator(
+        db_url=args.db_url,
+        table_name=args.table,
+        baseline=args.baseline,
+        window=args.window,
+        index_dir=args.index_dir,
+    )
+    calculator.calculate_and_store_climatology(
+        station_ids=args.station_ids or None, workers=args.workers
+    )
+    save_report(args, "climatology", calculator.report)
+    return 0
+
+
+def backfill_pipeline(ingestor, calculator, args) -> Pipeline:
+    """
+    Ingestion followed by statistics. With the sql backend the stats of a
+    station are recomputed as soon as its file is committed, while the other
+    files are still loading; a last incremental pass then picks up partitions
+    flagged by earlier, interrupted runs, and with --index-dir a new station
+    index snapshot is published. The parquet backend recomputes all
+    statistics once ingestion has finished.
+    """
+    from data_ingestion import station_id_from_path
+
+    pipeline = Pipeline()
+    pipeline.add(
+        "ingest",
+        lambda stage: ingest(
+            ingestor, args, lambda uri, report: stage.emit(station_id_from_path(uri))
+        ),
+    )
+    if ingestor.backend != "sql":
+        pipeline.add("stats", lambda stage: run_stats(calculator), after=("ingest",))
+        return pipeline
+    if args.index_dir:
+        pipeline.add(
+            "publish_index",
+            lambda stage: publish_index(
+                args, ingestor.engine, pipeline.stages["ingest"].report["result"]
+            ),
+            after=("ingest",),
+        )
+
+    def station_stats(stage):
+        totals = {"batches": 0, "partitions": 0, "rows": 0}
+        for station_ids in stage.batches():
+            calculator.calculate_and_store_stats(
+                incremental=True, station_ids=sorted(set(station_ids))
+            )
+            totals["batches"] += 1
+            totals["partitions"] += calculator.report["partitions"]
+            totals["rows"] += calculator.report["rows"]
+        return totals
+
+    pipeline.add("station_stats", station_stats, stream_from="ingest")
+    pipeline.add(
+        "stats",
+        lambda stage: run_stats(calculator, incremental=True),
+        after=("ingest", "station_stats"),
+    )
+    return pipeline
+
+
+def run_stats(calculator, incremental: bool = False) -> dict:
+    calculator.calculate_and_store_stats(incremental=incremental)
+    return calculator.report
+
+
+def run_backfill(args) -> int:
+    pipeline = backfill_pipeline(build_ingestor(args), build_calculator(args), args)
+    reports = pipeline.run()
+    summary = reports["ingest"].get("result")
+    if summary is not None:
+        save_report(args, "ingestion", summary)
+    stats = reports["stats"].get("result")
+    if stats is not None:
+        save_report(args, "weather_stats", stats)
+    save_report(
+        args,
+        "backfill",
+        {
+            "stages": {
+                name: report["elapsed_seconds"]
+                for name, report in reports.items()
+                if "elapsed_seconds" in report
+            },
+            "stations_streamed": reports.get("station_stats", {}).get("items", 0),
+            "max_station_lag_seconds": reports.get("station_stats", {}).get(
+                "max_lag_seconds", 0.0
+            ),
+        },
+    )
+    if not pipeline.succeeded or summary["files_failed"]:
+        return 1
+    return 0
+
+
+def run_publish_index(args) -> int:
+    from sqlalchemy import create_engine
+
+    publish_index(args, create_engine(args.db_url))
+    return 0
+
+
+def run_benchmark(args) -> int:
+    import run_benchmarks
+
+    run_benchmarks.main(args.benchmark_args)
+    return 0
+
+
+def baseline_years(value: str) -> tuple:
+    """
+    :param value: First and last year, e.g. "1991-2020"
+    """
+    try:
+        first, last = (int(year) for year in value.split("-"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected FIRST-LAST years, got {value!r}")
+    return first, last
+
+
+def build_parser() -> argparse.ArgumentParser:
+    database = argparse.ArgumentParser(add_help=False)
+    database.add_argument("--db-url", default=os.getenv("DATABASE_URL"))
+    database.add_argument(
+        "--backend",
+        choices=["sql", "parquet"],
+        default=os.getenv("STORAGE_BACKEND", "sql"),
+    )
+    database.add_argument("--parquet-root", default=os.getenv("PARQUET_ROOT"))
+    database.add_argument(
+        "--run-report-dir",
+        default=os.getenv("RUN_REPORT_DIR"),
+        help="directory for the JSON run reports served by the API's /metrics",
+    )
+
+    ingestion = argparse.ArgumentParser(add_help=False)
+    ingestion.add_argument(
+        "source",
+        nargs="?",
+        default=os.getenv("DATA_SOURCE", os.getenv("DATA_DIRECTORY")),
+        help="directory, glob pattern, .tar/.tar.gz/.tgz/.zip archive "
+        "or s3://bucket/prefix",
+    )
+    ingestion.add_argument("--table", default="weather_data")
+    ingestion.add_argument(
+        "--index-dir",
+        default=os.getenv("STATION_INDEX_DIR"),
+        help="publish a station index snapshot there after loading (sql backend)",
+    )
+    ingestion.add_argument(
+        "--workers", type=int, default=int(os.getenv("INGEST_WORKERS", "1"))
+    )
+    ingestion.add_argument(
+        "--writers", type=int, default=int(os.getenv("INGEST_WRITERS", "2"))
+    )
+    ingestion.add_argument(
+        "--chunksize", type=int, default=int(os.getenv("INGEST_CHUNKSIZE", "0")) or None
+    )
+    ingestion.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue files an interrupted run loaded part way from their last chunk",
+    )
+    ingestion.add_argument(
+        "--validation-rules",
+        default=os.getenv("INGEST_VALIDATION_RULES"),
+        help='comma-separated rule names, "none" to disable validation',
+    )
+    ingestion.add_argument(
+        "--retries", type=int, default=int(os.getenv("INGEST_RETRIES", "3"))
+    )
+    ingestion.add_argument(
+        "--retry-backoff",
+        type=float,
+        default=float(os.getenv("INGEST_RETRY_BACKOFF", "0.5")),
+    )
+
+    stats = argparse.ArgumentParser(add_help=False)
+    stats.add_argument("--stats-table", default="weather_stats")
+
+    parser = argparse.ArgumentParser(description="Weather data batch jobs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser(
+        "ingest",
+        parents=[database, ingestion],
+        help="load new and changed station files",
+    ).set_defaults(run=run_ingest)
+    compute_stats = commands.add_parser(
+        "compute-stats",
+        parents=[database, stats],
+        help="recompute the yearly statistics",
+    )
+    compute_stats.add_argument(
+        "--incremental",
+        action="store_true",
+        default=os.getenv("STATS_INCREMENTAL", "false").lower() == "true",
+        help="only recompute the partitions ingestion flagged as changed",
+    )
+    compute_stats.set_defaults(run=run_compute_stats)
+    commands.add_parser(
+        "backfill",
+        parents=[database, ingestion, stats],
+        help="ingest, computing each station's statistics as soon as it is loaded",
+    ).set_defaults(run=run_backfill)
+    climatology = commands.add_parser(
+        "climatology",
+        parents=[database],
+        help="recompute the normals, anomalies and records of every station",
+    )
+    climatology.add_argument("--table", default="weather_data")
+    climatology.add_argument(
+        "--baseline",
+        type=baseline_years,
+        default=os.getenv("CLIMATOLOGY_BASELINE", "1985-2014"),
+        help="years the normals are computed over, inclusive",
+    )
+    climatology.add_argument(
+        "--window",
+        type=int,
+        default=15,
+        help="days of the moving average smoothing the normals",
+    )
+    climatology.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("CLIMATOLOGY_WORKERS", str(os.cpu_count() or 1))),
+    )
+    climatology.add_argument(
+        "--index-dir",
+        default=os.getenv("STATION_INDEX_DIR"),
+        help="read the daily records from the station index snapshot there",
+    )
+    climatology.add_argument(
+        "--station",
+        dest="station_ids",
+        action="append",
+        help="only this station; repeatable",
+    )
+    climatology.set_defaults(run=run_climatology)
+    publish = commands.add_parser(
+        "publish-index", parents=[database], help="publish a station index snapshot"
+    )
+    publish.add_argument("--table", default="weather_data")
+    publish.add_argument("--index-dir", default=os.getenv("STATION_INDEX_DIR"))
+    publish.set_defaults(run=run_publish_index)
+    benchmark = commands.add_parser(
+        "benchmark",
+        help="run benchmarks/run_benchmarks.py with the remaining arguments",
+    )
+    benchmark.add_argument("benchmark_args", nargs=argparse.REMAINDER)
+    benchmark.set_defaults(run=run_benchmark)
+    return parser
+
+
+def main(argv=None) -> int:
+    load_dotenv()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command != "benchmark":
+        if not args.db_url:
+            parser.error("--db-url or DATABASE_URL is required")
+        if args.command in ("ingest", "backfill") and not args.source:
+            parser.error("a source, DATA_SOURCE or DATA_DIRECTORY is required")
+        if args.command == "publish-index" and not args.index_dir:
+            parser.error("--index-dir or STATION_INDEX_DIR is required")
+    try:
+        return args.run(args)
+    except Exception as e:
+        logger.error(f"{args.command} failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
 
 load_dotenv()
 
@@ -8,3 +9,68 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
+
+    # Connection pool, per worker process: a worker opens at most
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connections
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    # Seconds to wait for a free connection before failing the request
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+    # Seconds after which a connection is replaced, below server/proxy idle timeouts
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Server-side limit for a single API query; 0 disables it
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "5000"))
+
+    # Response cache: "memory" (per worker) or "redis" (shared by all workers)
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))
+    # Seconds between reads of the generation counter bumped by ingestion
+    CACHE_GENERATION_POLL = int(os.getenv("CACHE_GENERATION_POLL", "5"))
+
+    # Directory of the batch jobs' JSON run reports exported on /metrics
+    RUN_REPORT_DIR = os.getenv("RUN_REPORT_DIR")
+
+    # Station index snapshots published by ingestion; unset serves from SQL only
+    STATION_INDEX_DIR = os.getenv("STATION_INDEX_DIR")
+    # Seconds between checks for a newly published snapshot
+    STATION_INDEX_POLL = int(os.getenv("STATION_INDEX_POLL", "5"))
+
+    # Serverless cold starts: skip Flask-Migrate and marshmallow, which only
+    # the flask db commands need, and Swagger unless SWAGGER_ENABLED is set
+    LEAN_STARTUP = os.getenv("LEAN_STARTUP", "false").lower() == "true"
+    SWAGGER_ENABLED = (
+        os.getenv("SWAGGER_ENABLED", str(not LEAN_STARTUP)).lower() == "true"
+    )
+
+
+def engine_options(config, async_driver: bool = False) -> dict:
+    """
+    Engine keyword arguments for the configured pool. Only PostgreSQL gets a
+    sized pool and a statement timeout; SQLite keeps SQLAlchemy's defaults.
+    :param config: Flask config or any mapping with the DB_* settings
+    :param async_driver: Whether the engine uses asyncpg instead of psycopg2
+    :return: Keyword arguments for create_engine / create_async_engine
+    """
+    uri = config.get("SQLALCHEMY_DATABASE_URI")
+    if not uri or make_url(uri).get_backend_name() != "postgresql":
+        return {}
+
+    options = {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+    timeout = config["DB_STATEMENT_TIMEOUT_MS"]
+    if timeout:
+        if async_driver:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(timeout)}
+            }
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
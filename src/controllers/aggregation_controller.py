@@ -0,0 +1,212 @@
+from datetime import timedelta
+from sqlalchemy import tuple_
+from app import db
+from models.weather_data import WeatherData
+from models.weather_monthly import WeatherMonthly
+
+# Period of each bucket; seasons are meteorological (DJF, MAM, JJA, SON), so
+# a December belongs to the winter of the following year
+BUCKETS = {"day": "D", "week": "W-SUN", "month": "M", "season": "Q-NOV", "year": "Y"}
+# Metric -> (source column, aggregation); temperatures in Celsius and
+# precipitation in centimeters, as in weather_stats
+METRICS = {
+    "avg_max_temp": ("max_temp", "mean"),
+    "avg_min_temp": ("min_temp", "mean"),
+    "max_temp": ("max_temp", "max"),
+    "min_temp": ("min_temp", "min"),
+    "total_precipitation": ("precipitation", "sum"),
+    "rolling_precipitation": ("rolling_precipitation", "max"),
+    "days": ("date", "count"),
+}
+DEFAULT_METRICS = ["avg_max_temp", "avg_min_temp", "total_precipitation"]
+# Buckets and metrics that can be derived exactly from the monthly rollups
+ROLLUP_BUCKETS = {"month", "season", "year"}
+ROLLUP_METRICS = set(METRICS) - {"rolling_precipitation"}
+MAX_AGGREGATE_STATIONS = 100
+
+
+def check_metrics(bucket, metrics):
+    """
+    :return: The metrics to compute
+    :raises ValueError: On an unknown bucket or metric
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket: {bucket}")
+    metrics = metrics or DEFAULT_METRICS
+    unknown = [m for m in metrics if m not in METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+    return metrics
+
+
+def aggregate_frame(df, bucket="month", metrics=None, window=7, start_date=None):
+    """
+    Aggregate daily readings per station and bucket with pandas group-bys.
+    rolling_precipitation is the largest precipitation total of any `window`
+    consecutive days ending in the bucket.
+    :param df: Raw weather_data rows (station_id, date, max_temp, min_temp,
+        precipitation)
+    :param bucket: Key of BUCKETS
+    :param metrics: Keys of METRICS, DEFAULT_METRICS if empty
+    :param window: Days of the rolling precipitation window
+    :param start_date: Rows before this date only feed the rolling window
+    :return: {"count": n, "columns": {"station_id": [...], "period_start": [...], ...}}
+    :raises ValueError: On an unknown bucket or metric
+    """
+    import pandas as pd
+
+    metrics = check_metrics(bucket, metrics)
+    if df.empty:
+        return {
+            "count": 0,
+            "columns": {name: [] for name in ["station_id", "period_start"] + metrics},
+        }
+
+    df = df.assign(
+        date=pd.to_datetime(df["date"]),
+        max_temp=df["max_temp"] / 10,
+        min_temp=df["min_temp"] / 10,
+        precipitation=df["precipitation"] / 100,
+    ).sort_values(["station_id", "date"], ignore_index=True)
+    if "rolling_precipitation" in metrics:
+        # Time-based window, so missing days do not stretch it
+        rolling = df.groupby("station_id").rolling(f"{window}D", on="date")[
+            "precipitation"
+        ]
+        df["rolling_precipitation"] = rolling.sum().to_numpy()
+    if start_date is not None:
+        df = df[df["date"] >= pd.Timestamp(start_date)]
+
+    period = (
+        df["date"].dt.to_period(BUCKETS[bucket]).dt.start_time.rename("period_start")
+    )
+    grouped = df.groupby([df["station_id"], period])
+    result = grouped.agg(**{metric: METRICS[metric] for metric in metrics})
+    if "total_precipitation" in metrics:
+        # A bucket without any precipitation reading has an unknown total, not 0
+        result.loc[grouped["precipitation"].count() == 0, "total_precipitation"] = None
+    result = result.reset_index()
+    result["period_start"] = result["period_start"].dt.strftime("%Y-%m-%d")
+
+    result = result.astype(object).where(result.notna(), None)
+    return {
+        "count": len(result),
+        "columns": {name: result[name].tolist() for name in result.columns},
+    }
+
+
+def aggregate_monthly_frame(df, bucket="month", metrics=None):
+    """
+    Same aggregates as aggregate_frame, derived from monthly rollup rows.
+    :param df: weather_monthly rows
+    :param bucket: One of ROLLUP_BUCKETS
+    :param metrics: Subset of ROLLUP_METRICS, DEFAULT_METRICS if empty
+    :return: See aggregate_frame
+    """
+    import pandas as pd
+
+    metrics = check_metrics(bucket, metrics)
+    if df.empty:
+        return {
+            "count": 0,
+            "columns": {name: [] for name in ["station_id", "period_start"] + metrics},
+        }
+
+    month_start = pd.to_datetime(
+        pd.DataFrame({"year": df["year"], "month": df["month"], "day": 1})
+    )
+    period = month_start.dt.to_period(BUCKETS[bucket]).dt.start_time.rename(
+        "period_start"
+    )
+    grouped = df.groupby([df["station_id"], period]).sum(numeric_only=True)
+    extremes = df.groupby([df["station_id"], period]).agg(
+        max_temp=("max_temp_max", "max"), min_temp=("min_temp_min", "min")
+    )
+
+    def ratio(total, count, scale):
+        return (grouped[total] / grouped[count].where(grouped[count] > 0)) / scale
+
+    derived = {
+        "avg_max_temp": lambda: ratio("max_temp_sum", "max_temp_count", 10),
+        "avg_min_temp": lambda: ratio("min_temp_sum", "min_temp_count", 10),
+        "max_temp": lambda: extremes["max_temp"] / 10,
+        "min_temp": lambda: extremes["min_temp"] / 10,
+        "total_precipitation": lambda: (grouped["precipitation_sum"] / 100).where(
+            grouped["precipitation_count"] > 0
+        ),
+        "days": lambda: grouped["days"],
+    }
+    result = pd.DataFrame(
+        {metric: derived[metric]() for metric in metrics}
+    ).reset_index()
+    result["period_start"] = result["period_start"].dt.strftime("%Y-%m-%d")
+
+    result = result.astype(object).where(result.notna(), None)
+    return {
+        "count": len(result),
+        "columns": {name: result[name].tolist() for name in result.columns},
+    }
+
+
+def covered_by_rollups(start_date, end_date, bucket, metrics):
+    """
+    :return: Whether the request can be answered from whole monthly rollups
+    """
+    return (
+        bucket in ROLLUP_BUCKETS
+        and set(metrics or DEFAULT_METRICS) <= ROLLUP_METRICS
+        and start_date.day == 1
+        and (end_date + timedelta(days=1)).day == 1
+    )
+
+
+def aggregate_weather(
+    station_ids, start_date, end_date, bucket="month", metrics=None, window=7
+):
+    """
+    Aggregates of the daily readings of a few stations over a date range,
+    fetched in one query. Ranges of whole months in month, season or year
+    buckets are served from the monthly rollups instead of the daily rows.
+    :param station_ids: Stations to include
+    :param start_date: First date, inclusive
+    :param end_date: Last date, inclusive
+    :return: See aggregate_frame
+    :raises ValueError: On too many stations or an invalid bucket, metric or range
+    """
+    import pandas as pd
+
+    if not station_ids or len(station_ids) > MAX_AGGREGATE_STATIONS:
+        raise ValueError(
+            f"Between 1 and {MAX_AGGREGATE_STATIONS} stations are required"
+        )
+    if start_date > end_date:
+        raise ValueError("start_date must not be after end_date")
+    if window < 1:
+        raise ValueError("window must be at least 1 day")
+    check_metrics(bucket, metrics)
+
+    if covered_by_rollups(start_date, end_date, bucket, metrics):
+        month = tuple_(WeatherMonthly.year, WeatherMonthly.month)
+        query = WeatherMonthly.query.filter(
+            WeatherMonthly.station_id.in_(station_ids),
+            month >= (start_date.year, start_date.month),
+            month <= (end_date.year, end_date.month),
+        )
+        df = pd.read_sql(query.statement, db.session.connection())
+        return aggregate_monthly_frame(df, bucket, metrics)
+
+    fetch_from = start_date
+    if "rolling_precipitation" in (metrics or []):
+        fetch_from = start_date - timedelta(days=window - 1)
+    query = WeatherData.query.with_entities(
+        WeatherData.station_id,
+        WeatherData.date,
+        WeatherData.max_temp,
+        WeatherData.min_temp,
+        WeatherData.precipitation,
+    ).filter(
+        WeatherData.station_id.in_(station_ids),
+        WeatherData.date.between(fetch_from, end_date),
+    )
+    df = pd.read_sql(query.statement, db.session.connection())
+    return aggregate_frame(df, bucket, metrics, window, start_date)
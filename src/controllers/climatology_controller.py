@@ -0,0 +1,115 @@
+from models.climatology import WeatherAnomaly, WeatherNormals, WeatherRecord
+from controllers.weather_controller import iter_weather_data
+
+NORMALS_ROW = [
+    "month",
+    "day",
+    "max_temp_normal",
+    "min_temp_normal",
+    "precipitation_normal",
+    "years",
+    "record_max_temp",
+    "record_max_temp_year",
+    "record_min_temp",
+    "record_min_temp_year",
+]
+ANOMALY_ROW = [
+    "year",
+    "days",
+    "max_temp_anomaly",
+    "min_temp_anomaly",
+    "precipitation_anomaly",
+]
+RECORDS_ROW = [
+    "first_date",
+    "last_date",
+    "record_max_temp",
+    "record_max_temp_date",
+    "record_min_temp",
+    "record_min_temp_date",
+    "max_precipitation",
+    "max_precipitation_date",
+    "longest_dry_spell",
+    "dry_spell_start",
+    "dry_spell_end",
+]
+READINGS = ["max_temp", "min_temp", "precipitation"]
+
+
+def get_weather_normals(station_id, month=None):
+    query = WeatherNormals.query.with_entities(
+        *(getattr(WeatherNormals, name) for name in NORMALS_ROW)
+    ).filter_by(station_id=station_id)
+    if month:
+        query = query.filter_by(month=month)
+
+    data = query.order_by(WeatherNormals.month, WeatherNormals.day).all()
+    return [dict(zip(NORMALS_ROW, row)) for row in data]
+
+
+def get_weather_anomalies(station_id, start_year=None, end_year=None):
+    query = WeatherAnomaly.query.with_entities(
+        *(getattr(WeatherAnomaly, name) for name in ANOMALY_ROW)
+    ).filter_by(station_id=station_id)
+    if start_year:
+        query = query.filter(WeatherAnomaly.year >= start_year)
+    if end_year:
+        query = query.filter(WeatherAnomaly.year <= end_year)
+
+    data = query.order_by(WeatherAnomaly.year).all()
+    return [dict(zip(ANOMALY_ROW, row)) for row in data]
+
+
+def get_daily_anomalies(station_id, start_date=None, end_date=None):
+    """
+    Daily readings minus the normal of their calendar day, in degrees Celsius
+    and millimeters. Computed per request from the stored normals, rather
+    than stored next to every row of weather_data.
+    :return: One {"date", "max_temp_anomaly", ...} per day; an anomaly is None
+        where the reading or the normal is missing
+    """
+    normals = {
+        (row.month, row.day): row
+        for row in WeatherNormals.query.with_entities(
+            WeatherNormals.month,
+            WeatherNormals.day,
+            *(getattr(WeatherNormals, f"{name}_normal") for name in READINGS),
+        ).filter_by(station_id=station_id)
+    }
+    anomalies = []
+    for record in iter_weather_data(station_id, start_date, end_date):
+        date = record["date"]
+        normal = normals.get((int(date[5:7]), int(date[8:10])))
+        anomaly = {"date": date}
+        for name in READINGS:
+            value = record[name]
+            expected = None if normal is None else getattr(normal, f"{name}_normal")
+            anomaly[f"{name}_anomaly"] = (
+                None
+                if value is None or expected is None
+                else round(value - expected, 2)
+            )
+        anomalies.append(anomaly)
+    return anomalies
+
+
+def get_weather_records(station_id):
+    """
+    :return: The station's records, or None if it has no climatology
+    """
+    row = (
+        WeatherRecord.query.with_entities(
+            *(getattr(WeatherRecord, name) for name in RECORDS_ROW)
+        )
+        .filter_by(station_id=station_id)
+        .first()
+    )
+    if row is None:
+        return None
+    return {
+        "station_id": station_id,
+        **{
+            name: value.isoformat() if hasattr(value, "isoformat") else value
+            for name, value in zip(RECORDS_ROW, row)
+        },
+    }
@@ -1,21 +1,108 @@
+import base64
+import json
+from sqlalchemy import tuple_
 from models.weather_stats import WeatherStats
 
+STATS_ROW = [
+    "station_id",
+    "year",
+    "avg_max_temp",
+    "avg_min_temp",
+    "total_precipitation",
+]
+
 
 def get_weather_stats(station_id=None, year=None, page=1, per_page=10):
-    query = WeatherStats.query
+    query = WeatherStats.query.with_entities(
+        *(getattr(WeatherStats, name) for name in STATS_ROW)
+    )
     if station_id:
         query = query.filter_by(station_id=station_id)
     if year:
         query = query.filter_by(year=year)
 
-    data = query.paginate(page=page, per_page=per_page).items
-    return [
-        {
-            "station_id": s.station_id,
-            "year": s.year,
-            "avg_max_temp": s.avg_max_temp,
-            "avg_min_temp": s.avg_min_temp,
-            "total_precipitation": s.total_precipitation,
-        }
-        for s in data
-    ]
+    # Only the items are returned, so skip paginate's COUNT(*) query
+    data = query.paginate(page=page, per_page=per_page, count=False).items
+    return [dict(zip(STATS_ROW, row)) for row in data]
+
+
+STATS_FIELDS = STATS_ROW[2:]
+# Upper bound on stations per batch request, keeping the IN list reasonable
+MAX_BATCH_STATIONS = 500
+# Upper bound on rows per batch response; a year range alone spans every station
+MAX_BATCH_ROWS = 10000
+
+
+def encode_batch_cursor(station_id, year):
+    raw = json.dumps([station_id, year]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_batch_cursor(cursor):
+    """
+    :param cursor: Opaque cursor returned as next_cursor
+    :return: (station_id, year) of the last row of the previous page
+    :raises ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        station_id, year = json.loads(raw)
+        return str(station_id), int(year)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def get_weather_stats_batch(
+    station_ids, start_year=None, end_year=None, fields=None, cursor=None
+):
+    """
+    Statistics of many stations over a range of years in one IN/range query,
+    as a columnar payload with one array per field. At most MAX_BATCH_ROWS
+    rows are returned, ordered by (station_id, year); the next page seeks
+    past the last one.
+    :param station_ids: Stations to include
+    :param start_year: First year, inclusive
+    :param end_year: Last year, inclusive
+    :param fields: Statistics to return, all of STATS_FIELDS by default
+    :param cursor: next_cursor of the previous page, None for the first page
+    :return: {"count": n, "columns": {"station_id": [...], "year": [...], ...},
+        "next_cursor": cursor or None on the last page}
+    :raises ValueError: On too many stations, an unknown field or a malformed
+        cursor
+    """
+    if len(station_ids) > MAX_BATCH_STATIONS:
+        raise ValueError(f"At most {MAX_BATCH_STATIONS} stations per request")
+    after = decode_batch_cursor(cursor) if cursor else None
+    fields = fields or STATS_FIELDS
+    unknown = [f for f in fields if f not in STATS_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    names = ["station_id", "year"] + fields
+    query = WeatherStats.query.with_entities(
+        *(getattr(WeatherStats, name) for name in names)
+    )
+    if station_ids:
+        query = query.filter(WeatherStats.station_id.in_(station_ids))
+    if start_year:
+        query = query.filter(WeatherStats.year >= start_year)
+    if end_year:
+        query = query.filter(WeatherStats.year <= end_year)
+    if after:
+        query = query.filter(tuple_(WeatherStats.station_id, WeatherStats.year) > after)
+
+    rows = (
+        query.order_by(WeatherStats.station_id, WeatherStats.year)
+        .limit(MAX_BATCH_ROWS + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > MAX_BATCH_ROWS:
+        rows = rows[:MAX_BATCH_ROWS]
+        next_cursor = encode_batch_cursor(*rows[-1][:2])
+    columns = list(zip(*rows)) if rows else [()] * len(names)
+    return {
+        "count": len(rows),
+        "columns": {name: list(values) for name, values in zip(names, columns)},
+        "next_cursor": next_cursor,
+    }
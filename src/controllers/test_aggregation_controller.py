@@ -0,0 +1,134 @@
+import unittest
+from datetime import date
+import pandas as pd
+from controllers.aggregation_controller import (
+    aggregate_frame,
+    aggregate_monthly_frame,
+    covered_by_rollups,
+)
+
+
+def daily_frame():
+    dates = pd.date_range("2000-11-29", "2001-03-02").date
+    return pd.DataFrame(
+        {
+            "station_id": "ST001",
+            "date": dates,
+            "max_temp": 100,
+            "min_temp": -100,
+            "precipitation": [10 if d.day == 1 else 0 for d in dates],
+        }
+    )
+
+
+class TestAggregateFrame(unittest.TestCase):
+
+    def test_monthly_means_and_totals(self):
+        result = aggregate_frame(
+            daily_frame(), bucket="month", start_date=date(2000, 12, 1)
+        )
+
+        columns = result["columns"]
+        self.assertEqual(
+            columns["period_start"],
+            ["2000-12-01", "2001-01-01", "2001-02-01", "2001-03-01"],
+        )
+        self.assertEqual(columns["avg_max_temp"], [10.0] * 4)
+        self.assertEqual(columns["avg_min_temp"], [-10.0] * 4)
+        self.assertEqual(columns["total_precipitation"], [0.1] * 4)
+
+    def test_december_belongs_to_the_following_winter(self):
+        result = aggregate_frame(daily_frame(), bucket="season", metrics=["days"])
+
+        self.assertEqual(
+            result["columns"]["period_start"],
+            ["2000-09-01", "2000-12-01", "2001-03-01"],
+        )
+        self.assertEqual(result["columns"]["days"], [2, 90, 2])
+
+    def test_rolling_precipitation_uses_days_before_the_range(self):
+        df = daily_frame()
+        df.loc[df["date"] == date(2000, 11, 30), "precipitation"] = 20
+
+        result = aggregate_frame(
+            df,
+            bucket="year",
+            metrics=["rolling_precipitation"],
+            window=2,
+            start_date=date(2000, 12, 1),
+        )
+
+        self.assertEqual(
+            result["columns"]["period_start"], ["2000-01-01", "2001-01-01"]
+        )
+        self.assertAlmostEqual(result["columns"]["rolling_precipitation"][0], 0.3)
+        self.assertAlmostEqual(result["columns"]["rolling_precipitation"][1], 0.1)
+
+    def test_missing_precipitation_is_not_zero(self):
+        df = daily_frame()
+        df["precipitation"] = None
+
+        result = aggregate_frame(df, bucket="year", metrics=["total_precipitation"])
+
+        self.assertEqual(result["columns"]["total_precipitation"], [None, None])
+
+    def test_monthly_rollups_give_the_same_aggregates(self):
+        df = daily_frame()
+        df.loc[df.index[:40], "precipitation"] = None
+        date = pd.to_datetime(df["date"])
+        grouped = df.groupby(
+            [
+                df["station_id"],
+                date.dt.year.rename("year"),
+                date.dt.month.rename("month"),
+            ]
+        )
+        rollups = pd.DataFrame(
+            {
+                "days": grouped.size(),
+                "max_temp_sum": grouped["max_temp"].sum(),
+                "max_temp_count": grouped["max_temp"].count(),
+                "min_temp_sum": grouped["min_temp"].sum(),
+                "min_temp_count": grouped["min_temp"].count(),
+                "precipitation_sum": grouped["precipitation"].sum(),
+                "precipitation_count": grouped["precipitation"].count(),
+                "max_temp_max": grouped["max_temp"].max(),
+                "min_temp_min": grouped["min_temp"].min(),
+            }
+        ).reset_index()
+        metrics = ["avg_max_temp", "min_temp", "total_precipitation", "days"]
+
+        for bucket in ("month", "season", "year"):
+            expected = aggregate_frame(df, bucket, metrics)
+            result = aggregate_monthly_frame(rollups, bucket, metrics)
+            self.assertEqual(result["columns"].keys(), expected["columns"].keys())
+            for name, values in expected["columns"].items():
+                for value, expected_value in zip(result["columns"][name], values):
+                    if isinstance(value, float):
+                        self.assertAlmostEqual(value, expected_value)
+                    else:
+                        self.assertEqual(value, expected_value)
+
+    def test_only_whole_months_use_rollups(self):
+        self.assertTrue(
+            covered_by_rollups(date(2000, 1, 1), date(2000, 2, 29), "month", None)
+        )
+        self.assertFalse(
+            covered_by_rollups(date(2000, 1, 1), date(2000, 2, 28), "month", None)
+        )
+        self.assertFalse(
+            covered_by_rollups(date(2000, 1, 1), date(2000, 2, 29), "week", None)
+        )
+        self.assertFalse(
+            covered_by_rollups(
+                date(2000, 1, 1), date(2000, 2, 29), "month", ["rolling_precipitation"]
+            )
+        )
+
+    def test_unknown_bucket_is_rejected(self):
+        with self.assertRaises(ValueError):
+            aggregate_frame(daily_frame(), bucket="decade")
+
+
+if __name__ == "__main__":
+    unittest.main()
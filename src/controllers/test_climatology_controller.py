@@ -0,0 +1,96 @@
+import unittest
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from models.climatology import WeatherNormals, WeatherRecord
+from controllers.climatology_controller import get_daily_anomalies, get_weather_records
+
+
+class TestGetDailyAnomalies(unittest.TestCase):
+    @patch("controllers.climatology_controller.iter_weather_data")
+    def test_readings_minus_normal_of_calendar_day(self, iter_weather_data):
+        mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
+        mock_query.filter_by.return_value = [
+            SimpleNamespace(
+                month=2,
+                day=29,
+                max_temp_normal=5.0,
+                min_temp_normal=-2.5,
+                precipitation_normal=None,
+            )
+        ]
+        WeatherNormals.query = mock_query
+        iter_weather_data.return_value = iter(
+            [
+                {
+                    "date": "2024-02-29",
+                    "max_temp": 7.5,
+                    "min_temp": None,
+                    "precipitation": 1.0,
+                },
+                {
+                    "date": "2024-03-01",
+                    "max_temp": 7.5,
+                    "min_temp": 0.0,
+                    "precipitation": 0.0,
+                },
+            ]
+        )
+
+        result = get_daily_anomalies("ST001", date(2024, 2, 29), date(2024, 3, 1))
+
+        iter_weather_data.assert_called_once_with(
+            "ST001", date(2024, 2, 29), date(2024, 3, 1)
+        )
+        self.assertEqual(
+            result[0],
+            {
+                "date": "2024-02-29",
+                "max_temp_anomaly": 2.5,
+                "min_temp_anomaly": None,
+                "precipitation_anomaly": None,
+            },
+        )
+        # No normal for March 1
+        self.assertIsNone(result[1]["max_temp_anomaly"])
+
+
+class TestGetWeatherRecords(unittest.TestCase):
+    def test_unknown_station(self):
+        mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
+        mock_query.filter_by.return_value = mock_query
+        mock_query.first.return_value = None
+        WeatherRecord.query = mock_query
+
+        self.assertIsNone(get_weather_records("ST404"))
+
+    def test_dates_are_serialized(self):
+        mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
+        mock_query.filter_by.return_value = mock_query
+        mock_query.first.return_value = (
+            date(1985, 1, 1),
+            date(2014, 12, 31),
+            38.3,
+            date(1988, 7, 7),
+            -31.1,
+            date(1994, 1, 19),
+            101.1,
+            date(2013, 7, 10),
+            41,
+            date(2012, 7, 1),
+            date(2012, 8, 10),
+        )
+        WeatherRecord.query = mock_query
+
+        result = get_weather_records("ST001")
+
+        self.assertEqual(result["station_id"], "ST001")
+        self.assertEqual(result["record_max_temp_date"], "1988-07-07")
+        self.assertEqual(result["longest_dry_spell"], 41)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,28 +1,21 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from models.weather_stats import WeatherStats
-from controllers.stats_controller import get_weather_stats 
+from controllers.stats_controller import (
+    decode_batch_cursor,
+    get_weather_stats,
+    get_weather_stats_batch,
+)
 class TestGetWeatherStats(unittest.TestCase):
 
     def test_get_weather_stats_with_station_id(self):
         mock_data = [
-            MagicMock(
-                station_id="ST001",
-                year=2024,
-                avg_max_temp=300,
-                avg_min_temp=290,
-                total_precipitation=50
-            ),
-            MagicMock(
-                station_id="ST001",
-                year=2025,
-                avg_max_temp=305,
-                avg_min_temp=295,
-                total_precipitation=40
-            )
+            ("ST001", 2024, 300, 290, 50),
+            ("ST001", 2025, 305, 295, 40)
         ]
         
         mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
         mock_query.filter_by.return_value = mock_query
         mock_query.paginate.return_value.items = mock_data
         
@@ -38,16 +31,11 @@ class TestGetWeatherStats(unittest.TestCase):
 
     def test_get_weather_stats_without_station_id(self):
         mock_data = [
-            MagicMock(
-                station_id="ST001",
-                year=2024,
-                avg_max_temp=300,
-                avg_min_temp=290,
-                total_precipitation=50
-            )
+            ("ST001", 2024, 300, 290, 50)
         ]
         
         mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
         mock_query.filter_by.return_value = mock_query
         mock_query.paginate.return_value.items = mock_data
         
@@ -63,16 +51,11 @@ class TestGetWeatherStats(unittest.TestCase):
 
     def test_get_weather_stats_with_year_filter(self):
         mock_data = [
-            MagicMock(
-                station_id="ST001",
-                year=2024,
-                avg_max_temp=300,
-                avg_min_temp=290,
-                total_precipitation=50
-            )
+            ("ST001", 2024, 300, 290, 50)
         ]
         
         mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
         mock_query.filter_by.return_value = mock_query
         mock_query.paginate.return_value.items = mock_data
         
@@ -86,5 +69,84 @@ class TestGetWeatherStats(unittest.TestCase):
         self.assertEqual(result[0]["avg_min_temp"], 290)
         self.assertEqual(result[0]["total_precipitation"], 50)
 
+class TestGetWeatherStatsBatch(unittest.TestCase):
+
+    def test_returns_one_array_per_field(self):
+        mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
+        mock_query.filter.return_value = mock_query
+        mock_query.order_by.return_value.limit.return_value.all.return_value = [
+            ("ST001", 2023, 12.5),
+            ("ST001", 2024, 13.0),
+            ("ST002", 2023, 11.0),
+        ]
+
+        WeatherStats.query = mock_query
+
+        result = get_weather_stats_batch(
+            ["ST001", "ST002"], start_year=2023, end_year=2024, fields=["avg_max_temp"]
+        )
+
+        self.assertEqual(result["count"], 3)
+        self.assertEqual(
+            result["columns"],
+            {
+                "station_id": ["ST001", "ST001", "ST002"],
+                "year": [2023, 2024, 2023],
+                "avg_max_temp": [12.5, 13.0, 11.0],
+            },
+        )
+        self.assertEqual(mock_query.filter.call_count, 3)
+        self.assertIsNone(result["next_cursor"])
+
+    def test_empty_result_keeps_columns(self):
+        mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
+        mock_query.filter.return_value = mock_query
+        mock_query.order_by.return_value.limit.return_value.all.return_value = []
+
+        WeatherStats.query = mock_query
+
+        result = get_weather_stats_batch(["ST001"])
+
+        self.assertEqual(result["count"], 0)
+        self.assertEqual(result["columns"]["total_precipitation"], [])
+
+    def test_unknown_field_is_rejected(self):
+        with self.assertRaises(ValueError):
+            get_weather_stats_batch(["ST001"], fields=["station_name"])
+
+    @patch("controllers.stats_controller.MAX_BATCH_ROWS", 2)
+    def test_year_range_is_capped_with_a_cursor(self):
+        mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
+        mock_query.filter.return_value = mock_query
+        mock_query.order_by.return_value.limit.return_value.all.return_value = [
+            ("ST001", 2023, 12.5),
+            ("ST001", 2024, 13.0),
+            ("ST002", 2023, 11.0),
+        ]
+
+        WeatherStats.query = mock_query
+
+        result = get_weather_stats_batch(
+            [], start_year=2023, end_year=2024, fields=["avg_max_temp"]
+        )
+
+        mock_query.order_by.return_value.limit.assert_called_once_with(3)
+        self.assertEqual(result["count"], 2)
+        self.assertEqual(result["columns"]["station_id"], ["ST001", "ST001"])
+        self.assertEqual(decode_batch_cursor(result["next_cursor"]), ("ST001", 2024))
+
+        get_weather_stats_batch(
+            [], start_year=2023, fields=["avg_max_temp"], cursor=result["next_cursor"]
+        )
+        self.assertEqual(mock_query.filter.call_count, 4)
+
+    def test_malformed_cursor_is_rejected(self):
+        with self.assertRaises(ValueError):
+            get_weather_stats_batch(["ST001"], cursor="not a cursor")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,30 +1,26 @@
 import unittest
 from unittest.mock import MagicMock
-from datetime import datetime
+from datetime import date, datetime
+from flask import Flask
 from models.weather_data import WeatherData
-from controllers.weather_controller import get_weather_data
+from controllers.weather_controller import (
+    decode_cursor,
+    encode_cursor,
+    export_weather_data,
+    get_weather_data,
+    get_weather_data_page,
+)
 
 
 class TestGetWeatherData(unittest.TestCase):
     def test_get_weather_data_with_station_id(self):
         mock_data = [
-            MagicMock(
-                station_id="ST001",
-                date=datetime(2024, 12, 5),
-                max_temp=300,
-                min_temp=290,
-                precipitation=50,
-            ),
-            MagicMock(
-                station_id="ST001",
-                date=datetime(2024, 12, 6),
-                max_temp=305,
-                min_temp=295,
-                precipitation=40,
-            ),
+            ("ST001", datetime(2024, 12, 5), 30.0, 29.0, 5.0),
+            ("ST001", datetime(2024, 12, 6), 30.5, 29.5, 4.0),
         ]
 
         mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
         mock_query.filter_by.return_value = mock_query
         mock_query.paginate.return_value.items = mock_data
 
@@ -44,17 +40,10 @@ class TestGetWeatherData(unittest.TestCase):
         self.assertEqual(result[0]["precipitation"], 5.0)
 
     def test_get_weather_data_without_station_id(self):
-        mock_data = [
-            MagicMock(
-                station_id="ST001",
-                date=datetime(2024, 12, 5),
-                max_temp=300,
-                min_temp=290,
-                precipitation=50,
-            )
-        ]
+        mock_data = [("ST001", datetime(2024, 12, 5), 30.0, 29.0, 5.0)]
 
         mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
         mock_query.filter_by.return_value = mock_query
         mock_query.paginate.return_value.items = mock_data
 
@@ -73,6 +62,125 @@ class TestGetWeatherData(unittest.TestCase):
         self.assertEqual(result[0]["min_temp"], 29.0)
         self.assertEqual(result[0]["precipitation"], 5.0)
 
+    def test_get_weather_data_keeps_zero_readings(self):
+        mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
+        mock_query.filter_by.return_value = mock_query
+        mock_query.paginate.return_value.items = [
+            ("ST001", datetime(2024, 12, 5).date(), 0.0, -0.5, None)
+        ]
+
+        WeatherData.query = mock_query
+
+        result = get_weather_data(station_id="ST001")
+
+        self.assertEqual(result[0]["max_temp"], 0.0)
+        self.assertEqual(result[0]["min_temp"], -0.5)
+        self.assertIsNone(result[0]["precipitation"])
+        mock_query.paginate.assert_called_once_with(page=1, per_page=10, count=False)
+
+    def test_get_weather_data_page_returns_next_cursor(self):
+        mock_data = [
+            ("ST001", datetime(2024, 12, day).date(), 30.0, 29.0, 5.0)
+            for day in (5, 6, 7)
+        ]
+
+        mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
+        mock_query.filter_by.return_value = mock_query
+        mock_query.filter.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
+        mock_query.limit.return_value.all.return_value = mock_data
+
+        WeatherData.query = mock_query
+
+        result = get_weather_data_page(station_id="ST001", per_page=2)
+
+        mock_query.limit.assert_called_once_with(3)
+        mock_query.filter.assert_not_called()
+        self.assertEqual(len(result["items"]), 2)
+        self.assertEqual(result["items"][1]["date"], "2024-12-06")
+        self.assertEqual(
+            decode_cursor(result["next_cursor"]),
+            ("ST001", datetime(2024, 12, 6).date()),
+        )
+
+        mock_query.limit.return_value.all.return_value = mock_data[2:]
+        result = get_weather_data_page(
+            station_id="ST001", cursor=result["next_cursor"], per_page=2
+        )
+
+        mock_query.filter.assert_called_once()
+        self.assertEqual(len(result["items"]), 1)
+        self.assertIsNone(result["next_cursor"])
+
+    def test_decode_cursor_rejects_garbage(self):
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor")
+        self.assertEqual(
+            decode_cursor(encode_cursor("ST001", datetime(2024, 1, 1).date())),
+            ("ST001", datetime(2024, 1, 1).date()),
+        )
+
+    def test_export_weather_data_formats(self):
+        mock_data = [("ST001", datetime(2024, 12, 5).date(), 30.0, 29.0, 5.0)]
+
+        mock_query = MagicMock()
+        mock_query.with_entities.return_value = mock_query
+        mock_query.filter_by.return_value = mock_query
+        mock_query.order_by.return_value.yield_per.return_value = mock_data
+
+        WeatherData.query = mock_query
+
+        ndjson = b"".join(export_weather_data("ST001")).decode()
+        csv_text = "".join(export_weather_data("ST001", fmt="csv"))
+
+        self.assertEqual(
+            ndjson,
+            '{"station_id":"ST001","date":"2024-12-05","max_temp":30.0,'
+            '"min_temp":29.0,"precipitation":5.0}\n',
+        )
+        self.assertEqual(
+            csv_text.splitlines(),
+            [
+                "station_id,date,max_temp,min_temp,precipitation",
+                "ST001,2024-12-05,30.0,29.0,5.0",
+            ],
+        )
+        with self.assertRaises(ValueError):
+            export_weather_data("ST001", fmt="xml")
+
+
+class TestStationIndexLookups(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.index = MagicMock()
+        self.app.extensions["station_index"] = self.index
+        self.query = MagicMock()
+        self.query.with_entities.return_value = self.query
+        self.query.filter_by.return_value = self.query
+        WeatherData.query = self.query
+
+    def test_point_lookup_is_served_from_index(self):
+        self.index.lookup.return_value = ("ST001", date(2024, 12, 5), 30.0, 29.0, None)
+
+        with self.app.app_context():
+            result = get_weather_data(station_id="ST001", date=date(2024, 12, 5))
+
+        self.assertEqual(result[0]["date"], "2024-12-05")
+        self.assertIsNone(result[0]["precipitation"])
+        self.query.paginate.assert_not_called()
+
+    def test_index_miss_falls_back_to_sql(self):
+        self.index.lookup.return_value = None
+        self.query.paginate.return_value.items = []
+
+        with self.app.app_context():
+            result = get_weather_data(station_id="ST001", date=date(2024, 12, 5))
+
+        self.assertEqual(result, [])
+        self.query.paginate.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
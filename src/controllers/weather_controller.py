@@ -1,21 +1,188 @@
+import base64
+import csv
+import io
+import json
+from datetime import date as date_type
+import orjson
+from flask import current_app, has_app_context
+from sqlalchemy import Float, cast, tuple_
 from models.weather_data import WeatherData
 
+EXPORT_FIELDS = ["station_id", "date", "max_temp", "min_temp", "precipitation"]
+# Rows fetched per round trip from the server-side cursor during exports
+EXPORT_BATCH_SIZE = 5000
+
+
+def scaled(column, factor):
+    """
+    Reading converted from tenths in SQL; NULL stays NULL and 0 stays 0.0.
+    """
+    return (cast(column, Float) / factor).label(column.key)
+
+
+# Columns of a serialized weather row, selected as plain tuples
+WEATHER_ROW = (
+    WeatherData.station_id,
+    WeatherData.date,
+    scaled(WeatherData.max_temp, 10),
+    scaled(WeatherData.min_temp, 10),
+    scaled(WeatherData.precipitation, 10),
+)
+
+
+def serialize_weather_data(row):
+    """
+    :param row: Row selected with WEATHER_ROW
+    """
+    station_id, date, max_temp, min_temp, precipitation = row
+    return {
+        "station_id": station_id,
+        "date": date.isoformat(),
+        "max_temp": max_temp,
+        "min_temp": min_temp,
+        "precipitation": precipitation,
+    }
+
+
+def station_index():
+    """
+    :return: The app's StationIndex, or None if it serves from SQL only
+    """
+    return current_app.extensions.get("station_index") if has_app_context() else None
+
 
 def get_weather_data(station_id=None, date=None, page=1, per_page=10):
-    query = WeatherData.query
+    index = station_index()
+    if index is not None and station_id and date and page == 1:
+        # A station has one row per date, so the lookup is the whole page
+        row = index.lookup(station_id, date)
+        if row is not None:
+            return [serialize_weather_data(row)]
+
+    query = WeatherData.query.with_entities(*WEATHER_ROW)
     if station_id:
         query = query.filter_by(station_id=station_id)
     if date:
         query = query.filter_by(date=date)
 
-    data = query.paginate(page=page, per_page=per_page).items
-    return [
-        {
-            "station_id": d.station_id,
-            "date": d.date.isoformat(),
-            "max_temp": d.max_temp / 10 if d.max_temp else None,
-            "min_temp": d.min_temp / 10 if d.min_temp else None,
-            "precipitation": d.precipitation / 10 if d.precipitation else None,
-        }
-        for d in data
-    ]
+    # Only the items are returned, so skip paginate's COUNT(*) query
+    data = query.paginate(page=page, per_page=per_page, count=False).items
+    return [serialize_weather_data(d) for d in data]
+
+
+def encode_cursor(station_id, date):
+    raw = json.dumps([station_id, date.isoformat()]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    :param cursor: Opaque cursor returned as next_cursor
+    :return: (station_id, date) of the last row of the previous page
+    :raises ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        station_id, date = json.loads(raw)
+        return station_id, date_type.fromisoformat(date)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def get_weather_data_page(station_id=None, date=None, cursor=None, per_page=10):
+    """
+    Keyset pagination ordered by (station_id, date). Each page seeks past the
+    last row of the previous one, so deep pages cost the same as the first
+    and no COUNT(*) is issued.
+    :param cursor: next_cursor of the previous page, None for the first page
+    :return: {"items": [...], "next_cursor": cursor or None on the last page}
+    """
+    query = WeatherData.query.with_entities(*WEATHER_ROW)
+    if station_id:
+        query = query.filter_by(station_id=station_id)
+    if date:
+        query = query.filter_by(date=date)
+    if cursor:
+        query = query.filter(
+            tuple_(WeatherData.station_id, WeatherData.date) > decode_cursor(cursor)
+        )
+
+    rows = (
+        query.order_by(WeatherData.station_id, WeatherData.date)
+        .limit(per_page + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(*rows[-1][:2])
+    return {
+        "items": [serialize_weather_data(d) for d in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+def iter_weather_data(station_id, start_date=None, end_date=None):
+    """
+    Stream a station's records in date order, EXPORT_BATCH_SIZE rows at a
+    time, from the station index if it has the station and otherwise
+    through a server-side cursor.
+    """
+    index = station_index()
+    rows = (
+        None
+        if index is None
+        else index.range(station_id, start_date, end_date, EXPORT_BATCH_SIZE)
+    )
+    if rows is not None:
+        for row in rows:
+            yield serialize_weather_data(row)
+        return
+
+    query = WeatherData.query.with_entities(*WEATHER_ROW).filter_by(
+        station_id=station_id
+    )
+    if start_date:
+        query = query.filter(WeatherData.date >= start_date)
+    if end_date:
+        query = query.filter(WeatherData.date <= end_date)
+
+    for d in query.order_by(WeatherData.date).yield_per(EXPORT_BATCH_SIZE):
+        yield serialize_weather_data(d)
+
+
+def export_weather_data(station_id, start_date=None, end_date=None, fmt="ndjson"):
+    """
+    :param fmt: "ndjson" for one JSON object per line, or "csv"
+    :return: Generator of text chunks
+    """
+    records = iter_weather_data(station_id, start_date, end_date)
+    if fmt == "ndjson":
+        return _iter_ndjson(records)
+    if fmt == "csv":
+        return _iter_csv(records)
+    raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def _iter_ndjson(records):
+    lines = []
+    for record in records:
+        lines.append(orjson.dumps(record))
+        if len(lines) == EXPORT_BATCH_SIZE:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def _iter_csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for i, record in enumerate(records, 1):
+        writer.writerow(record)
+        if i % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
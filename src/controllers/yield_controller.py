@@ -0,0 +1,40 @@
+from models.yield_correlation import YieldCorrelation, YieldWeatherYearly
+
+
+def get_yield_correlation():
+    data = YieldCorrelation.query.order_by(YieldCorrelation.feature).all()
+    return [
+        {
+            "feature": c.feature,
+            "n": c.n,
+            "r": c.r,
+            "r_squared": c.r_squared,
+            "slope": c.slope,
+            "intercept": c.intercept,
+        }
+        for c in data
+    ]
+
+
+def get_yield_yearly(start_year=None, end_year=None):
+    query = YieldWeatherYearly.query
+    if start_year:
+        query = query.filter(YieldWeatherYearly.year >= start_year)
+    if end_year:
+        query = query.filter(YieldWeatherYearly.year <= end_year)
+
+    data = query.order_by(YieldWeatherYearly.year).all()
+    return [
+        {
+            "year": y.year,
+            "stations": y.stations,
+            "avg_max_temp": y.avg_max_temp,
+            "avg_min_temp": y.avg_min_temp,
+            "total_precipitation": y.total_precipitation,
+            "gs_avg_max_temp": y.gs_avg_max_temp,
+            "gs_avg_min_temp": y.gs_avg_min_temp,
+            "gs_precipitation": y.gs_precipitation,
+            "yield_amount": y.yield_amount,
+        }
+        for y in data
+    ]
@@ -0,0 +1,368 @@
+import glob
+import hashlib
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Iterator, Optional, Union
+
+ARCHIVE_EXTENSIONS = (".tar", ".tar.gz", ".tgz", ".zip")
+
+
+def sha256_stream(f) -> str:
+    """
+    :param f: Binary file object, read to the end in 1 MiB blocks
+    :return: Hex SHA-256 of its content
+    """
+    digest = hashlib.sha256()
+    for block in iter(lambda: f.read(1 << 20), b""):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def prefetch(items, fetch, workers: int = 1, depth: int = 4) -> Iterator:
+    """
+    Yield fetch(item) for every item in order while up to depth further
+    fetches run ahead on a thread pool, so the consumer does not wait on I/O
+    as long as it is slower than the fetches.
+    :param items: Items to fetch
+    :param fetch: Callable fetching one item
+    :param workers: Fetches running at the same time
+    :param depth: Fetched or in-flight items kept ahead of the consumer
+    """
+    items = iter(items)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    pending = deque(pool.submit(fetch, item) for item in islice(items, depth))
+    try:
+        while pending:
+            result = pending.popleft().result()
+            for item in islice(items, 1):
+                pending.append(pool.submit(fetch, item))
+            yield result
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class SourceFile(ABC):
+    """
+    One input file of a source, identified by a URI that is stable across runs.
+    """
+
+    def __init__(self, uri: str, name: str, size: int, mtime_ns: int):
+        """
+        :param uri: Path or URL recorded in the manifest
+        :param name: File name; the station id and compression derive from it
+        :param size: Size in bytes
+        :param mtime_ns: Modification time in nanoseconds
+        """
+        self.uri = uri
+        self.name = name
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    def fingerprint(self) -> dict:
+        """
+        :return: Manifest row for the file without its content hash
+        """
+        return {"path": self.uri, "size": self.size, "mtime_ns": self.mtime_ns}
+
+    @abstractmethod
+    def content_hash(self) -> str:
+        """
+        :return: Hash that changes with the file's content
+        """
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.uri!r})"
+
+
+class LocalFile(SourceFile):
+    def __init__(self, path: str):
+        stat = os.stat(path)
+        super().__init__(
+            os.path.abspath(path),
+            os.path.basename(path),
+            stat.st_size,
+            stat.st_mtime_ns,
+        )
+        self.path = path
+
+    def content_hash(self) -> str:
+        with open(self.path, "rb") as f:
+            return sha256_stream(f)
+
+
+class LocalSource:
+    """
+    Files of a local directory or matching a glob pattern, read in place.
+    """
+
+    def __init__(
+        self, location: str, file_extension: Union[str, tuple] = (".txt", ".txt.gz")
+    ):
+        """
+        :param location: Directory, or glob pattern such as /data/wx_*/USC*.txt
+        :param file_extension: Extension, or tuple of extensions, of the files to read
+        """
+        self.location = location
+        self.file_extension = file_extension
+
+    def list_files(self) -> list:
+        pattern = self.location
+        if os.path.isdir(pattern):
+            pattern = os.path.join(glob.escape(pattern), "*")
+        return [
+            LocalFile(path)
+            for path in sorted(glob.glob(pattern))
+            if path.endswith(self.file_extension) and os.path.isfile(path)
+        ]
+
+    def fetch(self, files: list) -> Iterator[tuple]:
+        """
+        :return: (SourceFile, local path) for every file, in order
+        """
+        for file in files:
+            yield file, file.path
+
+    def release(self, path: str):
+        pass
+
+
+class SpooledSource(ABC):
+    """
+    Base of the sources whose files are copied to a local spool directory
+    before parsing. Copies run ahead of the consumer and are deleted once
+    the consumer releases them, so at most about `depth` files are on disk.
+    """
+
+    workers = 1
+
+    def __init__(self, depth: int = 8, spool_dir: Optional[str] = None):
+        """
+        :param depth: Files copied ahead of the one being processed
+        :param spool_dir: Parent of the temporary spool directory
+        """
+        self.depth = depth
+        self.spool_dir = spool_dir
+
+    @abstractmethod
+    def copy(self, file: SourceFile, path: str):
+        """
+        Copy the content of file to the local path.
+        """
+
+    def fetch(self, files: list) -> Iterator[tuple]:
+        """
+        :return: (SourceFile, local path) for every file, in order
+        """
+        spool = tempfile.mkdtemp(prefix="weather-source-", dir=self.spool_dir)
+
+        def fetch_one(numbered):
+            # One directory per file keeps names, which carry the station id,
+            # unique even if two keys share a base name
+            i, file = numbered
+            os.mkdir(os.path.join(spool, str(i)))
+            path = os.path.join(spool, str(i), file.name)
+            self.copy(file, path)
+            return file, path
+
+        try:
+            yield from prefetch(enumerate(files), fetch_one, self.workers, self.depth)
+        finally:
+            shutil.rmtree(spool, ignore_errors=True)
+
+    def release(self, path: str):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class ArchiveMember(SourceFile):
+    def __init__(self, archive: "ArchiveSource", member: str, size: int, mtime_ns: int):
+        super().__init__(
+            f"{os.path.abspath(archive.path)}!{member}",
+            os.path.basename(member),
+            size,
+            mtime_ns,
+        )
+        self.archive = archive
+        self.member = member
+
+    def content_hash(self) -> str:
+        return self.archive.member_hash(self.member)
+
+
+class ArchiveSource(SpooledSource):
+    """
+    Members of a tar (optionally gzip-compressed) or zip archive. Members are
+    extracted by a single reader in archive order, which keeps the reads of
+    a compressed tar sequential.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        file_extension: Union[str, tuple] = (".txt", ".txt.gz"),
+        depth: int = 8,
+        spool_dir: Optional[str] = None,
+    ):
+        """
+        :param path: Path to the .tar, .tar.gz, .tgz or .zip file
+        :param file_extension: Extension, or tuple of extensions, of the members to read
+        """
+        super().__init__(depth, spool_dir)
+        self.path = path
+        self.file_extension = file_extension
+        self.is_zip = path.endswith(".zip")
+        self._hashes = None
+
+    def list_files(self) -> list:
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as archive:
+                return [
+                    ArchiveMember(
+                        self,
+                        info.filename,
+                        info.file_size,
+                        int(datetime(*info.date_time).timestamp() * 1e9),
+                    )
+                    for info in archive.infolist()
+                    if not info.is_dir() and info.filename.endswith(self.file_extension)
+                ]
+        with tarfile.open(self.path, "r:*") as archive:
+            return [
+                ArchiveMember(self, info.name, info.size, int(info.mtime * 1e9))
+                for info in archive.getmembers()
+                if info.isfile() and info.name.endswith(self.file_extension)
+            ]
+
+    def member_hash(self, member: str) -> str:
+        """
+        Content hash of a member. Zip members are read from their own offset;
+        the members of a tar are all hashed in one pass on the first call, as
+        extracting them one by one rescans a compressed tar from its start.
+        """
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as archive, archive.open(member) as f:
+                return sha256_stream(f)
+        if self._hashes is None:
+            self._hashes = {}
+            with tarfile.open(self.path, "r|*") as archive:
+                for info in archive:
+                    if info.isfile() and info.name.endswith(self.file_extension):
+                        self._hashes[info.name] = sha256_stream(
+                            archive.extractfile(info)
+                        )
+        return self._hashes[member]
+
+    def fetch(self, files: list) -> Iterator[tuple]:
+        self._archive = (
+            zipfile.ZipFile(self.path)
+            if self.is_zip
+            else tarfile.open(self.path, "r:*")
+        )
+        try:
+            yield from super().fetch(files)
+        finally:
+            self._archive.close()
+
+    def copy(self, file: ArchiveMember, path: str):
+        if self.is_zip:
+            source = self._archive.open(file.member)
+        else:
+            source = self._archive.extractfile(file.member)
+        with source, open(path, "wb") as target:
+            shutil.copyfileobj(source, target, 1 << 20)
+
+
+class S3Object(SourceFile):
+    def __init__(self, bucket: str, key: str, size: int, mtime_ns: int, etag: str):
+        super().__init__(f"s3://{bucket}/{key}", key.rsplit("/", 1)[-1], size, mtime_ns)
+        self.key = key
+        self.etag = etag
+
+    def content_hash(self) -> str:
+        # The ETag changes with the content, so objects are never downloaded
+        # just to be compared
+        return self.etag
+
+
+class S3Source(SpooledSource):
+    """
+    Objects under a prefix of an S3-compatible bucket (AWS S3, MinIO, ...).
+    Several objects download at once, up to `depth` ahead of the parser, and
+    large objects are fetched with concurrent ranged reads.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        file_extension: Union[str, tuple] = (".txt", ".txt.gz"),
+        client=None,
+        workers: int = 8,
+        depth: int = 16,
+        spool_dir: Optional[str] = None,
+    ):
+        """
+        :param bucket: Bucket name
+        :param prefix: Key prefix of the station files
+        :param file_extension: Extension, or tuple of extensions, of the objects to read
+        :param client: boto3 S3 client; by default one for S3_ENDPOINT_URL,
+            or AWS itself if that is not set
+        :param workers: Objects downloading at the same time
+        :param depth: Objects downloaded ahead of the one being processed
+        """
+        super().__init__(depth, spool_dir)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.file_extension = file_extension
+        self.workers = workers
+        if client is None:
+            import boto3
+
+            client = boto3.client("s3", endpoint_url=os.getenv("S3_ENDPOINT_URL"))
+        self.client = client
+
+    def list_files(self) -> list:
+        files = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                if obj["Key"].endswith(self.file_extension):
+                    files.append(
+                        S3Object(
+                            self.bucket,
+                            obj["Key"],
+                            obj["Size"],
+                            int(obj["LastModified"].timestamp() * 1e9),
+                            obj["ETag"].strip('"'),
+                        )
+                    )
+        return files
+
+    def copy(self, file: S3Object, path: str):
+        from boto3.s3.transfer import TransferConfig
+
+        self.client.download_file(
+            self.bucket, file.key, path, Config=TransferConfig(max_concurrency=4)
+        )
+
+
+def open_source(location: str, file_extension: Union[str, tuple] = (".txt", ".txt.gz")):
+    """
+    :param location: s3://bucket/prefix, a tar or zip archive, a directory
+        or a glob pattern
+    :return: Source reading the station files at location
+    """
+    if location.startswith("s3://"):
+        bucket, _, prefix = location[len("s3://") :].partition("/")
+        return S3Source(bucket, prefix, file_extension)
+    if location.endswith(ARCHIVE_EXTENSIONS):
+        return ArchiveSource(location, file_extension)
+    return LocalSource(location, file_extension)
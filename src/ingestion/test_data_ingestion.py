@@ -0,0 +1,511 @@
+import gzip
+import pytest
+from unittest.mock import MagicMock, patch
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError, OperationalError
+from data_ingestion import (
+    WeatherDataIngestor,
+    is_transient_error,
+    iter_weather_file,
+    validate_weather_frame,
+)
+
+
+def write_station_file(directory, station_id, rows):
+    path = directory / f"{station_id}.txt"
+    path.write_text(
+        "".join(f"{d}\t{mx:>5}\t{mn:>5}\t{p:>5}\n" for d, mx, mn, p in rows)
+    )
+    return path
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Fixture with two small station files and one malformed file."""
+    directory = tmp_path / "wx_data"
+    directory.mkdir()
+    write_station_file(
+        directory,
+        "USC00000001",
+        [
+            (19850101, -22, -128, 94),
+            (19850102, -122, -217, 0),
+            (19850103, -9999, -244, 0),
+        ],
+    )
+    write_station_file(
+        directory, "USC00000002", [(19850101, 10, -5, -9999), (19850102, 20, 0, 12)]
+    )
+    (directory / "USC00000003.txt").write_text(
+        "19850101\t1\t2\t3\n19850102\t1\t2\t3\t4\t5\n"
+    )
+    return directory
+
+
+@pytest.fixture
+def ingestor(tmp_path):
+    """Fixture with an ingestor writing to a throwaway SQLite database."""
+    return WeatherDataIngestor(
+        db_url=f"sqlite:///{tmp_path / 'weather.db'}", table_name="weather_data"
+    )
+
+
+def read_table(ingestor):
+    return pd.read_sql(
+        "SELECT station_id, date, max_temp, min_temp, precipitation FROM weather_data "
+        "ORDER BY station_id, date",
+        create_engine(ingestor.db_url),
+    )
+
+
+def test_read_weather_file_cleans_missing_values(data_dir, ingestor):
+    """Test -9999 readings become NA and the station id comes from the file name."""
+    df = ingestor.read_weather_file(str(data_dir / "USC00000001.txt"))
+
+    assert len(df) == 3
+    assert df["station_id"].unique().tolist() == ["USC00000001"]
+    assert pd.isna(df.iloc[2]["max_temp"])
+
+
+def test_process_directory_serial(data_dir, ingestor):
+    """Test the serial path loads every valid file and isolates the bad one."""
+    summary = ingestor.process_directory(str(data_dir))
+
+    assert summary["files_processed"] == 2
+    assert summary["files_failed"] == 1
+    assert summary["failed_files"] == [str(data_dir / "USC00000003.txt")]
+    assert summary["rows"] == 5
+    assert len(read_table(ingestor)) == 5
+    assert (summary["rows_read"], summary["rows_dropped"]) == (5, 0)
+    assert set(summary["stages"]) == {"parse", "clean", "validate", "load"}
+
+
+def test_process_directory_parallel_matches_serial(data_dir, ingestor):
+    """Test the process pool path produces the same rows as the serial path."""
+    summary = ingestor.process_directory(
+        str(data_dir), workers=2, writers=1, max_pending=1
+    )
+
+    assert summary["files_processed"] == 2
+    assert summary["files_failed"] == 1
+    assert summary["rows"] == 5
+    assert summary["rows_per_second"] > 0
+    assert summary["stages"]["parse"] > 0
+    assert read_table(ingestor)["station_id"].value_counts().to_dict() == {
+        "USC00000001": 3,
+        "USC00000002": 2,
+    }
+
+
+def test_process_directory_missing(tmp_path, ingestor):
+    """Test a missing directory returns no summary."""
+    assert ingestor.process_directory(str(tmp_path / "missing")) is None
+
+
+def test_ingest_data_to_db_uses_copy_on_postgres(data_dir, ingestor):
+    """Test PostgreSQL loads stream a CSV buffer through COPY and merge from staging."""
+    df = ingestor.read_weather_file(str(data_dir / "USC00000001.txt"))
+    conn = MagicMock()
+    conn.dialect.name = "postgresql"
+    cursor = conn.connection.cursor.return_value.__enter__.return_value
+    copied = []
+    cursor.copy_expert.side_effect = lambda sql, buf: copied.append(buf.getvalue())
+
+    with patch.object(ingestor, "engine") as engine, patch(
+        "data_ingestion.inspect"
+    ) as mock_inspect:
+        engine.begin.return_value.__enter__.return_value = conn
+        mock_inspect.return_value.has_table.return_value = True
+        ingestor.ingest_data_to_db(df)
+
+    statements = [c.args[0] for c in cursor.execute.call_args_list]
+    assert statements[0].startswith(
+        "CREATE TEMP TABLE IF NOT EXISTS weather_data_staging"
+    )
+    assert statements[1].startswith("INSERT INTO weather_data")
+    assert "COPY weather_data_staging" in cursor.copy_expert.call_args.args[0]
+    assert copied[0].splitlines() == [
+        "USC00000001,1985-01-01,-22,-128,94",
+        "USC00000001,1985-01-02,-122,-217,0",
+        "USC00000001,1985-01-03,,-244,0",
+    ]
+
+
+def test_process_directory_skips_unchanged_and_upserts_changed(data_dir, ingestor):
+    """Test a re-run skips unchanged files and upserts rows of a changed file."""
+    ingestor.process_directory(str(data_dir))
+    write_station_file(
+        data_dir,
+        "USC00000002",
+        [(19850101, 10, -5, -9999), (19850102, 25, 0, 12), (19850103, 30, 1, 0)],
+    )
+
+    summary = ingestor.process_directory(str(data_dir))
+
+    assert summary["files_skipped"] == 1
+    assert summary["files_changed"] == 2
+    assert summary["files_processed"] == 1
+    assert summary["rows"] == 3
+    table = read_table(ingestor)
+    assert len(table) == 6
+    station = table[table["station_id"] == "USC00000002"]
+    assert station["max_temp"].tolist() == [10, 25, 30]
+
+
+def test_process_directory_skips_touched_identical_file(data_dir, ingestor):
+    """Test a file with a new mtime but identical content is not reloaded."""
+    ingestor.process_directory(str(data_dir))
+    path = data_dir / "USC00000001.txt"
+    path.write_text(path.read_text())
+
+    summary = ingestor.process_directory(str(data_dir))
+
+    assert summary["files_skipped"] == 2
+    assert summary["rows"] == 0
+
+
+def test_process_directory_streaming_gzip(data_dir, ingestor):
+    """Test chunked streaming of a gzip-compressed file gives the same rows."""
+    plain = data_dir / "USC00000001.txt"
+    with gzip.open(data_dir / "USC00000004.txt.gz", "wt") as f:
+        f.write(plain.read_text())
+
+    summary = ingestor.process_directory(str(data_dir), chunksize=2)
+
+    assert summary["files_processed"] == 3
+    table = read_table(ingestor)
+    station = table[table["station_id"] == "USC00000004"]
+    assert station["min_temp"].tolist() == [-128, -217, -244]
+    assert station["max_temp"].isna().tolist() == [False, False, True]
+
+
+def test_iter_weather_file_uses_compact_dtypes(data_dir):
+    """Test streamed chunks carry compact reading dtypes and a categorical station."""
+    chunks = list(iter_weather_file(str(data_dir / "USC00000001.txt"), chunksize=2))
+
+    assert [len(c) for c in chunks] == [2, 1]
+    assert chunks[0]["max_temp"].dtype == "Int16"
+    assert chunks[0]["precipitation"].dtype == "Int32"
+    assert chunks[0]["station_id"].dtype == "category"
+
+
+def test_ingestion_marks_dirty_partitions(data_dir, ingestor):
+    """Test loaded files flag their (station_id, year) partitions for the stats job."""
+    ingestor.process_directory(str(data_dir))
+
+    dirty = pd.read_sql(
+        "SELECT station_id, year FROM weather_stats_dirty ORDER BY station_id",
+        create_engine(ingestor.db_url),
+    )
+    assert dirty.values.tolist() == [["USC00000001", 1985], ["USC00000002", 1985]]
+
+
+def test_monthly_rollups_stay_exact_across_chunks_and_reloads(data_dir, ingestor):
+    """Test rollups match the daily rows after chunked loads and a changed file."""
+    rows = [(19850130, 10, 1, 5), (19850131, 20, 2, -9999), (19850201, 30, 3, 7)]
+    write_station_file(data_dir, "USC00000002", rows)
+    ingestor.process_directory(str(data_dir), chunksize=1)
+    write_station_file(
+        data_dir, "USC00000002", rows[:1] + [(19850131, 40, 4, 1)] + rows[2:]
+    )
+    ingestor.process_directory(str(data_dir), chunksize=2)
+
+    rollups = pd.read_sql(
+        "SELECT * FROM weather_monthly WHERE station_id = 'USC00000002' ORDER BY month",
+        create_engine(ingestor.db_url),
+    )
+    january = rollups.iloc[0]
+    assert rollups["month"].tolist() == [1, 2]
+    assert january["days"] == 2
+    assert january["max_temp_sum"] == 50
+    assert january["max_temp_max"] == 40
+    assert january["min_temp_min"] == 1
+    assert (january["precipitation_sum"], january["precipitation_count"]) == (6, 2)
+
+
+@pytest.mark.parametrize("chunksize", [None, 2])
+def test_rows_removed_from_changed_file_are_deleted(data_dir, ingestor, chunksize):
+    """Test a reload replaces the months in the file, keeping rollups equal to rows."""
+    write_station_file(
+        data_dir,
+        "USC00000002",
+        [
+            (19850101, 10, 5, 1),
+            (19850102, 110, 60, 0),
+            (19850103, 120, 70, 5),
+            (19850201, 1, 0, 0),
+        ],
+    )
+    ingestor.process_directory(str(data_dir))
+    write_station_file(
+        data_dir, "USC00000002", [(19850101, 100, 50, 1), (19850201, 1, 0, 0)]
+    )
+
+    ingestor.process_directory(str(data_dir), chunksize=chunksize)
+
+    engine = create_engine(ingestor.db_url)
+    station = read_table(ingestor).query("station_id == 'USC00000002'")
+    assert station["max_temp"].tolist() == [100, 1]
+    rollups = pd.read_sql(
+        "SELECT month, days, max_temp_sum, min_temp_sum, precipitation_sum "
+        "FROM weather_monthly WHERE station_id = 'USC00000002' ORDER BY month",
+        engine,
+    )
+    assert rollups.values.tolist() == [[1, 1, 100, 50, 1], [2, 1, 1, 0, 0]]
+
+
+@pytest.mark.parametrize("chunksize", [None, 2])
+def test_invalid_rows_are_quarantined(data_dir, ingestor, chunksize):
+    """Test impossible readings are kept out of weather_data and replaced on reload."""
+    bad = data_dir / "USC00000004.txt"
+    write_station_file(
+        data_dir,
+        "USC00000004",
+        [
+            (19850101, 10, 20, 0),
+            (19850102, 10, 0, -5),
+            (19850103, 700, 0, 0),
+            (19850104, 10, 0, 0),
+        ],
+    )
+
+    summary = ingestor.process_directory(str(data_dir), chunksize=chunksize)
+
+    assert summary["rows_rejected"] == 3
+    assert summary["quality"][str(bad)]["rows"] == 1
+    assert summary["quality"][str(bad)]["rules"] == {
+        "min_above_max": 1,
+        "negative_precipitation": 1,
+        "temperature_out_of_range": 1,
+    }
+    assert len(read_table(ingestor).query("station_id == 'USC00000004'")) == 1
+
+    write_station_file(
+        data_dir, "USC00000004", [(19850104, 10, 0, 0), (19850104, 11, 1, 0)]
+    )
+    summary = ingestor.process_directory(str(data_dir), chunksize=chunksize)
+    quarantine = pd.read_sql(
+        "SELECT source_path, max_temp, rule FROM weather_quarantine",
+        create_engine(ingestor.db_url),
+    )
+
+    assert summary["quality"][str(bad)]["rules"] == {"duplicate_date": 1}
+    assert quarantine.values.tolist() == [[str(bad), 10, "duplicate_date"]]
+    assert read_table(ingestor).query("station_id == 'USC00000004'")[
+        "max_temp"
+    ].tolist() == [11]
+
+
+@pytest.mark.parametrize("chunksize", [None, 2])
+def test_rows_rejected_on_reload_are_no_longer_served(data_dir, ingestor, chunksize):
+    """Test a row that loaded before and fails validation on reload is removed."""
+    write_station_file(
+        data_dir,
+        "USC00000002",
+        [(19850101, 10, 5, 1), (19850102, 110, 60, 0), (19850201, 120, 70, 5)],
+    )
+    ingestor.process_directory(str(data_dir))
+    write_station_file(
+        data_dir,
+        "USC00000002",
+        [(19850101, 10, 5, 1), (19850102, 50, 60, 0), (19850201, 120, 170, 5)],
+    )
+
+    ingestor.process_directory(str(data_dir), chunksize=chunksize)
+
+    engine = create_engine(ingestor.db_url)
+    station = read_table(ingestor).query("station_id == 'USC00000002'")
+    assert station["max_temp"].tolist() == [10]
+    quarantine = pd.read_sql(
+        "SELECT date, rule FROM weather_quarantine ORDER BY date", engine
+    )
+    assert quarantine["rule"].tolist() == ["min_above_max", "min_above_max"]
+    rollups = pd.read_sql(
+        "SELECT month, days FROM weather_monthly WHERE station_id = 'USC00000002'",
+        engine,
+    )
+    assert rollups.values.tolist() == [[1, 1]]
+
+
+def test_validate_weather_frame_rules_and_limits():
+    """Test rules can be selected and limits overridden."""
+    df = pd.DataFrame(
+        {
+            "station_id": ["USC00000001"] * 3,
+            "date": pd.to_datetime(["1985-01-01", "1985-01-02", "1985-01-03"]),
+            "max_temp": pd.array([450, None, 10], dtype="Int16"),
+            "min_temp": pd.array([0, 450, 20], dtype="Int16"),
+            "precipitation": pd.array([0, None, -1], dtype="Int32"),
+        }
+    )
+
+    valid, rejected = validate_weather_frame(df, limits={"max_temp": 400})
+    assert valid.empty
+    assert rejected["rule"].tolist() == [
+        "temperature_out_of_range",
+        "temperature_out_of_range",
+        "min_above_max",
+    ]
+
+    valid, rejected = validate_weather_frame(df, rules=["negative_precipitation"])
+    assert len(valid) == 2
+    assert rejected["date"].tolist() == [pd.Timestamp("1985-01-03")]
+
+
+def test_resume_continues_after_last_committed_chunk(data_dir, tmp_path):
+    """Test an interrupted streamed load resumes after its checkpoint and ends exact."""
+    ingestor = WeatherDataIngestor(
+        db_url=f"sqlite:///{tmp_path / 'weather.db'}",
+        table_name="weather_data",
+        retries=0,
+    )
+    rows = [
+        (19850130, 10, 1, 5),
+        (19850131, 20, 2, 6),
+        (19850201, 30, 3, 7),
+        (19850202, 40, 4, 8),
+    ]
+    path = write_station_file(data_dir, "USC00000002", rows)
+    write_frame = ingestor.write_frame
+    calls = []
+
+    def failing_write(*args, **kwargs):
+        if kwargs["checkpoint"]["path"] == str(path):
+            calls.append(args)
+            if len(calls) == 4:
+                raise OperationalError(
+                    "INSERT", {}, Exception("server closed the connection")
+                )
+        return write_frame(*args, **kwargs)
+
+    with patch.object(ingestor, "write_frame", side_effect=failing_write):
+        with pytest.raises(OperationalError):
+            ingestor.process_directory(str(data_dir), chunksize=1)
+
+    summary = ingestor.process_directory(str(data_dir), resume=True)
+
+    assert summary["files_resumed"] == 1
+    assert summary["quality"][str(path)]["rows_read"] == 1
+    engine = create_engine(ingestor.db_url)
+    loaded = read_table(ingestor).query("station_id == 'USC00000002'")
+    assert loaded["max_temp"].tolist() == [10, 20, 30, 40]
+    monthly = pd.read_sql(
+        "SELECT month, days, max_temp_sum FROM weather_monthly "
+        "WHERE station_id = 'USC00000002' ORDER BY month",
+        engine,
+    )
+    assert monthly.values.tolist() == [[1, 2, 30], [2, 2, 70]]
+    assert pd.read_sql("SELECT * FROM ingestion_checkpoint", engine).empty
+    manifest = pd.read_sql("SELECT path, rows FROM ingestion_manifest", engine)
+    assert manifest.set_index("path")["rows"][str(path)] == 4
+
+
+def test_failed_run_still_bumps_cache_generation(data_dir, tmp_path):
+    """Test files committed before a run fails invalidate the response cache."""
+    ingestor = WeatherDataIngestor(
+        db_url=f"sqlite:///{tmp_path / 'weather.db'}",
+        table_name="weather_data",
+        retries=0,
+    )
+    write_frame = ingestor.write_frame
+
+    def failing_write(df, *args, **kwargs):
+        if "USC00000002" in df["station_id"].tolist():
+            raise OperationalError(
+                "INSERT", {}, Exception("server closed the connection")
+            )
+        return write_frame(df, *args, **kwargs)
+
+    with patch.object(ingestor, "write_frame", side_effect=failing_write):
+        with pytest.raises(OperationalError):
+            ingestor.process_directory(str(data_dir))
+
+    assert read_table(ingestor)["station_id"].unique().tolist() == ["USC00000001"]
+    generation = pd.read_sql(
+        "SELECT generation FROM cache_generation", create_engine(ingestor.db_url)
+    )
+    assert generation["generation"].tolist() == [1]
+
+
+def test_ingest_retries_transient_errors_and_raises_others(data_dir, tmp_path):
+    """Test a lost connection is retried and a constraint violation surfaces at once."""
+    ingestor = WeatherDataIngestor(
+        db_url=f"sqlite:///{tmp_path / 'weather.db'}",
+        table_name="weather_data",
+        retry_backoff=0,
+    )
+    df = ingestor.read_weather_file(str(data_dir / "USC00000001.txt"))
+    update_rollups = ingestor._update_monthly_rollups
+    attempts = []
+
+    def flaky_update(*args):
+        attempts.append(args)
+        if len(attempts) < 3:
+            raise OperationalError(
+                "INSERT",
+                {},
+                Exception("server closed the connection"),
+                connection_invalidated=True,
+            )
+        return update_rollups(*args)
+
+    with patch.object(ingestor, "_update_monthly_rollups", side_effect=flaky_update):
+        assert ingestor.ingest_data_to_db(df)
+    assert len(attempts) == 3
+    assert len(read_table(ingestor)) == 3
+
+    violation = IntegrityError("INSERT", {}, Exception("duplicate key"))
+    with patch.object(
+        ingestor, "_update_monthly_rollups", side_effect=violation
+    ) as mock_rollups:
+        with pytest.raises(IntegrityError):
+            ingestor.ingest_data_to_db(df)
+    assert mock_rollups.call_count == 1
+
+
+def test_only_retryable_database_errors_are_transient():
+    """Test disconnects, serialization failures, deadlocks and locks are retried."""
+
+    class PgError(Exception):
+        def __init__(self, pgcode):
+            super().__init__(pgcode)
+            self.pgcode = pgcode
+
+    def error(orig, **kwargs):
+        return OperationalError("UPDATE", {}, orig, **kwargs)
+
+    assert is_transient_error(
+        error(Exception("server closed the connection"), connection_invalidated=True)
+    )
+    assert is_transient_error(error(PgError("40001")))
+    assert is_transient_error(error(PgError("40P01")))
+    assert is_transient_error(error(Exception("database is locked")))
+    assert not is_transient_error(error(Exception("no such table: weather_data")))
+    assert not is_transient_error(error(PgError("53100")))
+    assert not is_transient_error(
+        IntegrityError("INSERT", {}, Exception("duplicate key"))
+    )
+
+
+def test_process_directory_parquet_backend(data_dir, tmp_path):
+    """Test the Parquet backend writes station/year partitions, replaced on re-runs."""
+    root = tmp_path / "parquet"
+    ingestor = WeatherDataIngestor(
+        db_url="sqlite://",
+        table_name="weather_data",
+        backend="parquet",
+        parquet_root=str(root),
+    )
+
+    ingestor.process_directory(str(data_dir))
+    summary = ingestor.process_directory(str(data_dir), chunksize=2)
+
+    assert summary["rows"] == 5
+    assert (root / "station_id=USC00000001" / "year=1985").is_dir()
+    df = pd.read_parquet(root)
+    assert len(df) == 5
+    assert df["station_id"].astype(str).value_counts().to_dict() == {
+        "USC00000001": 3,
+        "USC00000002": 2,
+    }
@@ -0,0 +1,166 @@
+import hashlib
+import io
+import tarfile
+import threading
+import time
+import zipfile
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from data_ingestion import WeatherDataIngestor
+from sources import ArchiveSource, LocalSource, S3Source, open_source, prefetch
+
+STATION_FILES = {
+    "USC00000001.txt": "19850101\t  -22\t -128\t   94\n19850102\t -122\t -217\t    0\n",
+    "USC00000002.txt": "19850101\t   10\t   -5\t-9999\n",
+}
+
+
+@pytest.fixture
+def ingestor(tmp_path):
+    """Fixture with an ingestor writing to a throwaway SQLite database."""
+    return WeatherDataIngestor(
+        db_url=f"sqlite:///{tmp_path / 'weather.db'}", table_name="weather_data"
+    )
+
+
+def count_rows(ingestor):
+    return pd.read_sql(
+        "SELECT COUNT(*) AS n FROM weather_data", create_engine(ingestor.db_url)
+    )["n"][0]
+
+
+def test_local_source_lists_directories_and_globs(tmp_path):
+    """Test a directory lists its matching files and a glob spans directories."""
+    for directory in ("wx_a", "wx_b"):
+        (tmp_path / directory).mkdir()
+        for name, content in STATION_FILES.items():
+            (tmp_path / directory / name).write_text(content)
+    (tmp_path / "wx_a" / "README.md").write_text("not a station")
+
+    assert [f.name for f in LocalSource(str(tmp_path / "wx_a")).list_files()] == [
+        "USC00000001.txt",
+        "USC00000002.txt",
+    ]
+    files = open_source(str(tmp_path / "wx_*" / "USC*1.txt")).list_files()
+    assert [f.uri for f in files] == [
+        str(tmp_path / "wx_a" / "USC00000001.txt"),
+        str(tmp_path / "wx_b" / "USC00000001.txt"),
+    ]
+
+
+@pytest.mark.parametrize("suffix", [".tar.gz", ".zip"])
+def test_archive_source_is_ingested_and_skipped_when_unchanged(
+    tmp_path, ingestor, suffix
+):
+    """Test archive members load like files and are recorded per member."""
+    path = tmp_path / f"wx_data{suffix}"
+    if suffix == ".zip":
+        with zipfile.ZipFile(path, "w") as archive:
+            for name, content in STATION_FILES.items():
+                archive.writestr(f"wx_data/{name}", content)
+    else:
+        with tarfile.open(path, "w:gz") as archive:
+            for name, content in STATION_FILES.items():
+                data = content.encode()
+                info = tarfile.TarInfo(f"wx_data/{name}")
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+    source = open_source(str(path))
+    assert isinstance(source, ArchiveSource)
+    summary = ingestor.process_source(source)
+
+    assert summary["files_processed"] == 2
+    assert summary["rows"] == 3
+    assert count_rows(ingestor) == 3
+    assert f"{path}!wx_data/USC00000001.txt" in summary["quality"]
+    # Spooled copies are removed once loaded
+    assert list(tmp_path.glob("**/weather-source-*")) == []
+
+    summary = ingestor.process_source(open_source(str(path)))
+    assert summary["files_skipped"] == 2
+    assert summary["files_processed"] == 0
+
+
+def test_tar_members_are_hashed_in_one_pass(tmp_path):
+    """Test hashing every member of a compressed tar reads the archive once."""
+    path = tmp_path / "wx_data.tar.gz"
+    with tarfile.open(path, "w:gz") as archive:
+        for name, content in STATION_FILES.items():
+            data = content.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    files = ArchiveSource(str(path)).list_files()
+
+    with patch("sources.tarfile.open", wraps=tarfile.open) as opened:
+        hashes = [f.content_hash() for f in files]
+
+    assert opened.call_count == 1
+    assert hashes == [
+        hashlib.sha256(content.encode()).hexdigest()
+        for content in STATION_FILES.values()
+    ]
+
+
+def test_s3_source_downloads_changed_objects(ingestor, monkeypatch):
+    """Test objects are listed, downloaded and only re-fetched when changed."""
+    boto3 = pytest.importorskip("boto3")
+    moto = pytest.importorskip("moto")
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="weather")
+        for name, content in STATION_FILES.items():
+            client.put_object(
+                Bucket="weather", Key=f"wx_data/{name}", Body=content.encode()
+            )
+        client.put_object(Bucket="weather", Key="other/USC00000009.txt", Body=b"")
+
+        source = S3Source("weather", "wx_data/", client=client, workers=2, depth=2)
+        summary = ingestor.process_source(source)
+        assert summary["files_processed"] == 2
+        assert count_rows(ingestor) == 3
+        assert "s3://weather/wx_data/USC00000002.txt" in summary["quality"]
+
+        client.put_object(
+            Bucket="weather",
+            Key="wx_data/USC00000002.txt",
+            Body=(
+                STATION_FILES["USC00000002.txt"] + "19850102\t   20\t    0\t   12\n"
+            ).encode(),
+        )
+        fetched = []
+        copy = source.copy
+
+        def record_copy(file, path):
+            fetched.append(file.key)
+            copy(file, path)
+
+        monkeypatch.setattr(source, "copy", record_copy)
+        summary = ingestor.process_source(source)
+        assert summary["files_skipped"] == 1
+        assert fetched == ["wx_data/USC00000002.txt"]
+        assert count_rows(ingestor) == 4
+
+
+def test_prefetch_keeps_order_and_bounds_read_ahead():
+    """Test results come back in order with at most depth fetches ahead."""
+    started = []
+    lock = threading.Lock()
+
+    def fetch(i):
+        with lock:
+            started.append(i)
+        time.sleep(0.01 * (5 - i % 5))
+        return i * 10
+
+    results = []
+    for result in prefetch(range(10), fetch, workers=4, depth=3):
+        # Besides the items consumed, at most depth more were started
+        assert len(started) <= result // 10 + 1 + 3
+        results.append(result)
+    assert results == [i * 10 for i in range(10)]
@@ -0,0 +1,26 @@
+import os
+import pandas as pd
+from yield_ingestion import YieldDataIngestor
+
+YIELD_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "..", "yld_data", "US_corn_grain_yield.txt"
+)
+
+
+def test_process_file_is_idempotent(tmp_path):
+    """Test the yield file loads once per year, however often it is ingested."""
+    ingestor = YieldDataIngestor(db_url=f"sqlite:///{tmp_path / 'yield.db'}")
+
+    assert ingestor.process_file(YIELD_FILE) == 30
+    assert ingestor.process_file(YIELD_FILE) == 30
+
+    df = pd.read_sql("SELECT * FROM yield_data ORDER BY year", ingestor.engine)
+    assert len(df) == 30
+    assert df.iloc[0].tolist() == [1985, 225447]
+
+
+def test_process_file_missing(tmp_path):
+    """Test a missing file is reported as not loaded."""
+    ingestor = YieldDataIngestor(db_url=f"sqlite:///{tmp_path / 'yield.db'}")
+
+    assert ingestor.process_file(str(tmp_path / "missing.txt")) is None
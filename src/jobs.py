@@ -0,0 +1,71 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from sqlalchemy import BigInteger, Column, Integer, MetaData, Table
+from sqlalchemy.exc import SQLAlchemyError
+
+CACHE_GENERATION_TABLE = "cache_generation"
+
+# Bumped after every write to invalidate cached API responses
+cache_generation = Table(
+    CACHE_GENERATION_TABLE,
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("generation", BigInteger, nullable=False),
+)
+
+
+def dialect_insert(conn):
+    """
+    :return: The insert construct of the connection's dialect, which supports
+        ON CONFLICT
+    """
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif conn.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise SQLAlchemyError(f"Upsert is not supported on {conn.dialect.name}")
+    return insert
+
+
+def bump_cache_generation(engine):
+    """
+    Invalidate cached API responses in a single upsert, so jobs running at
+    the same time can bump concurrently. The table is created by the
+    migrations or the schema setup of the job.
+    :param engine: Engine of the database the API reads from
+    """
+    with engine.begin() as conn:
+        stmt = dialect_insert(conn)(cache_generation).values(id=1, generation=1)
+        conn.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["id"],
+                set_={"generation": cache_generation.c.generation + 1},
+            )
+        )
+
+
+@contextmanager
+def timed(report: dict, stage: str):
+    """
+    Add the wall time of the block to report["stages"][stage].
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        report["stages"][stage] += time.perf_counter() - started
+
+
+def write_run_report(directory: str, job: str, report: dict):
+    """
+    Replace <directory>/<job>.json with the report of the latest run; the
+    API exports the latest reports on /metrics.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{job}.json")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump({**report, "job": job, "finished_at": time.time()}, f, indent=2)
+    os.replace(f"{path}.tmp", path)
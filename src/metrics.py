@@ -0,0 +1,232 @@
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def format_labels(names, values) -> str:
+    """
+    :return: Prometheus label set, e.g. {method="GET",status="200"}
+    """
+    pairs = []
+    for name, value in zip(names, values):
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Cumulative latency histogram per label set, local to one worker process.
+    """
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple, buckets=LATENCY_BUCKETS
+    ):
+        """
+        :param name: Metric name
+        :param documentation: HELP text
+        :param labelnames: Names of the labels passed to observe, in order
+        :param buckets: Upper bounds of the buckets in seconds, ascending
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts, sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            i = bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(
+                (labels, (list(counts), total, count))
+                for labels, (counts, total, count) in self._series.items()
+            )
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                bucket = format_labels(self.labelnames + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            bucket = format_labels(self.labelnames + ("le",), labels + ("+Inf",))
+            lines.append(f"{self.name}_bucket{bucket} {count}")
+            label_set = format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_set} {format_value(total)}")
+            lines.append(f"{self.name}_count{label_set} {count}")
+        return lines
+
+
+def render_run_reports(directory: str) -> list:
+    """
+    Gauges from the JSON run reports the batch jobs leave in directory:
+    the numeric counters, the seconds per stage and the time of the run.
+    """
+    counters, stages, durations, finished = [], [], [], []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        try:
+            with open(path) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        job = report.get("job") or os.path.splitext(os.path.basename(path))[0]
+        for name, value in report.items():
+            if name in ("elapsed_seconds", "finished_at"):
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                labels = format_labels(("job", "counter"), (job, name))
+                counters.append(f"weather_batch_count{labels} {format_value(value)}")
+        for stage, seconds in (report.get("stages") or {}).items():
+            labels = format_labels(("job", "stage"), (job, stage))
+            stages.append(
+                f"weather_batch_stage_seconds{labels} {format_value(seconds)}"
+            )
+        labels = format_labels(("job",), (job,))
+        if "elapsed_seconds" in report:
+            durations.append(
+                f"weather_batch_duration_seconds{labels} "
+                f"{format_value(report['elapsed_seconds'])}"
+            )
+        if "finished_at" in report:
+            finished.append(
+                f"weather_batch_last_run_timestamp_seconds{labels} "
+                f"{format_value(report['finished_at'])}"
+            )
+
+    lines = []
+    for name, documentation, samples in (
+        ("weather_batch_count", "Counters of the latest batch run.", counters),
+        (
+            "weather_batch_stage_seconds",
+            "Seconds per stage of the latest batch run.",
+            stages,
+        ),
+        (
+            "weather_batch_duration_seconds",
+            "Wall time of the latest batch run.",
+            durations,
+        ),
+        (
+            "weather_batch_last_run_timestamp_seconds",
+            "End of the latest batch run.",
+            finished,
+        ),
+    ):
+        if samples:
+            lines += [
+                f"# HELP {name} {documentation}",
+                f"# TYPE {name} gauge",
+                *samples,
+            ]
+    return lines
+
+
+class Metrics:
+    """
+    API request latencies and database query timings of one worker process,
+    plus the latest batch run reports, in the Prometheus text format.
+    """
+
+    def __init__(self, run_report_dir=None):
+        """
+        :param run_report_dir: Directory the batch jobs write their JSON run
+            reports to, if any
+        """
+        self.run_report_dir = run_report_dir
+        self.requests = Histogram(
+            "weather_api_request_duration_seconds",
+            "API request latency.",
+            ("method", "endpoint", "status"),
+        )
+        self.queries = Histogram(
+            "weather_db_query_duration_seconds",
+            "Database statement execution time.",
+            ("operation",),
+        )
+
+    def render(self) -> str:
+        lines = self.requests.render() + self.queries.render()
+        if self.run_report_dir:
+            lines += render_run_reports(self.run_report_dir)
+        return "\n".join(lines) + "\n"
+
+    def instrument_app(self, app):
+        """
+        Time every request and serve the metrics on /metrics.
+        """
+
+        @app.before_request
+        def start_timer():
+            g.request_started = time.perf_counter()
+
+        @app.after_request
+        def record_latency(response):
+            started = g.pop("request_started", None)
+            if started is not None:
+                # The route template, so path parameters do not add series
+                endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+                self.requests.observe(
+                    time.perf_counter() - started,
+                    request.method,
+                    endpoint,
+                    response.status_code,
+                )
+            return response
+
+        app.add_url_rule(
+            "/metrics",
+            "metrics",
+            lambda: Response(self.render(), content_type=CONTENT_TYPE),
+        )
+
+    def instrument_engine(self, engine):
+        """
+        Time every statement executed on the engine, labelled by its verb.
+        """
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def start_query(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context.query_started = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def record_query(conn, cursor, statement, parameters, context, executemany):
+            started = getattr(context, "query_started", None)
+            if started is not None:
+                operation = (
+                    statement.split(None, 1)[0].upper() if statement.strip() else ""
+                )
+                self.queries.observe(time.perf_counter() - started, operation)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(run_report_dir=config.get("RUN_REPORT_DIR"))
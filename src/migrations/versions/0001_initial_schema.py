@@ -0,0 +1,67 @@
+"""Initial schema, as in answers/data_modeling.txt
+
+Databases created before migrations existed already have these tables;
+mark them as migrated with `flask db stamp 0001` before upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "weather_data",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("station_id", sa.String(length=50), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("max_temp", sa.Integer()),
+        sa.Column("min_temp", sa.Integer()),
+        sa.Column("precipitation", sa.Integer()),
+    )
+    op.create_table(
+        "weather_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("station_id", sa.String(length=50), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("avg_max_temp", sa.Float()),
+        sa.Column("avg_min_temp", sa.Float()),
+        sa.Column("total_precipitation", sa.Float()),
+    )
+    op.create_table(
+        "ingestion_manifest",
+        sa.Column("path", sa.String(length=1024), primary_key=True),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("mtime_ns", sa.BigInteger(), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("rows", sa.Integer(), nullable=False),
+        sa.Column("ingested_at", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "weather_stats_dirty",
+        sa.Column("station_id", sa.String(length=50), primary_key=True),
+        sa.Column("year", sa.Integer(), primary_key=True),
+    )
+    op.create_table(
+        "cache_generation",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("generation", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("cache_generation")
+    op.drop_table("weather_stats_dirty")
+    op.drop_table("ingestion_manifest")
+    op.drop_table("weather_stats")
+    op.drop_table("weather_data")
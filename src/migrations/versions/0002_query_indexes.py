@@ -0,0 +1,58 @@
+"""Unique constraints and indexes for the API and stats query patterns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The batch jobs create their tables, constraints included, on first use.
+    # A database they have used may already have these, and has no
+    # weather_stats until the stats job has run; that creates it with its
+    # constraint.
+    inspector = sa.inspect(op.get_bind())
+    for table, name, columns in (
+        ("weather_data", "uq_weather_data_station_date", ["station_id", "date"]),
+        ("weather_stats", "uq_weather_stats_station_year", ["station_id", "year"]),
+    ):
+        if not inspector.has_table(table):
+            continue
+        existing = {c["name"] for c in inspector.get_unique_constraints(table)}
+        if name in existing:
+            continue
+        # Earlier appends may have left duplicates; keep the most recent row
+        op.execute(
+            f"DELETE FROM {table} WHERE id NOT IN "
+            f"(SELECT MAX(id) FROM {table} GROUP BY {', '.join(columns)})"
+        )
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.create_unique_constraint(name, columns)
+    if inspector.has_table("weather_data"):
+        indexes = {i["name"] for i in inspector.get_indexes("weather_data")}
+        if "ix_weather_data_date_brin" not in indexes:
+            op.create_index(
+                "ix_weather_data_date_brin",
+                "weather_data",
+                ["date"],
+                postgresql_using="brin",
+            )
+
+
+def downgrade():
+    op.drop_index("ix_weather_data_date_brin", table_name="weather_data")
+    if sa.inspect(op.get_bind()).has_table("weather_stats"):
+        with op.batch_alter_table("weather_stats") as batch_op:
+            batch_op.drop_constraint("uq_weather_stats_station_year", type_="unique")
+    with op.batch_alter_table("weather_data") as batch_op:
+        batch_op.drop_constraint("uq_weather_data_station_date", type_="unique")
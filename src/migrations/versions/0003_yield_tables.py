@@ -0,0 +1,56 @@
+"""Corn yield and yield/weather correlation tables
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The yield ingestor and the correlation job create these on first use
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("yield_data"):
+        op.create_table(
+            "yield_data",
+            sa.Column("year", sa.Integer(), primary_key=True),
+            sa.Column("yield_amount", sa.BigInteger()),
+        )
+    if not inspector.has_table("yield_weather_yearly"):
+        op.create_table(
+            "yield_weather_yearly",
+            sa.Column("year", sa.Integer(), primary_key=True),
+            sa.Column("stations", sa.Integer()),
+            sa.Column("avg_max_temp", sa.Float()),
+            sa.Column("avg_min_temp", sa.Float()),
+            sa.Column("total_precipitation", sa.Float()),
+            sa.Column("gs_avg_max_temp", sa.Float()),
+            sa.Column("gs_avg_min_temp", sa.Float()),
+            sa.Column("gs_precipitation", sa.Float()),
+            sa.Column("yield_amount", sa.Float()),
+        )
+    if not inspector.has_table("yield_correlation"):
+        op.create_table(
+            "yield_correlation",
+            sa.Column("feature", sa.String(length=50), primary_key=True),
+            sa.Column("n", sa.Integer()),
+            sa.Column("r", sa.Float()),
+            sa.Column("r_squared", sa.Float()),
+            sa.Column("slope", sa.Float()),
+            sa.Column("intercept", sa.Float()),
+        )
+
+
+def downgrade():
+    op.drop_table("yield_correlation")
+    op.drop_table("yield_weather_yearly")
+    op.drop_table("yield_data")
@@ -0,0 +1,96 @@
+"""Monthly rollups of weather_data, backfilled from the existing rows
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Ingestion creates weather_monthly itself and keeps it up to date from
+    # then on, so a database it has loaded into only needs the backfill if
+    # nothing has been rolled up yet
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("weather_monthly"):
+        monthly = sa.table(
+            "weather_monthly",
+            *(
+                sa.column(name)
+                for name in (
+                    "station_id",
+                    "year",
+                    "month",
+                    "days",
+                    "max_temp_sum",
+                    "max_temp_count",
+                    "min_temp_sum",
+                    "min_temp_count",
+                    "precipitation_sum",
+                    "precipitation_count",
+                    "max_temp_max",
+                    "min_temp_min",
+                )
+            ),
+        )
+        if bind.execute(sa.select(sa.func.count()).select_from(monthly)).scalar():
+            return
+    else:
+        monthly = op.create_table(
+            "weather_monthly",
+            sa.Column("station_id", sa.String(length=50), primary_key=True),
+            sa.Column("year", sa.Integer(), primary_key=True),
+            sa.Column("month", sa.Integer(), primary_key=True),
+            sa.Column("days", sa.BigInteger(), nullable=False),
+            sa.Column("max_temp_sum", sa.BigInteger(), nullable=False),
+            sa.Column("max_temp_count", sa.BigInteger(), nullable=False),
+            sa.Column("min_temp_sum", sa.BigInteger(), nullable=False),
+            sa.Column("min_temp_count", sa.BigInteger(), nullable=False),
+            sa.Column("precipitation_sum", sa.BigInteger(), nullable=False),
+            sa.Column("precipitation_count", sa.BigInteger(), nullable=False),
+            sa.Column("max_temp_max", sa.Integer()),
+            sa.Column("min_temp_min", sa.Integer()),
+        )
+
+    weather = sa.table(
+        "weather_data",
+        sa.column("station_id"),
+        sa.column("date", sa.Date()),
+        sa.column("max_temp"),
+        sa.column("min_temp"),
+        sa.column("precipitation"),
+    )
+    year = sa.extract("year", weather.c.date)
+    month = sa.extract("month", weather.c.date)
+    op.execute(
+        monthly.insert().from_select(
+            [c.name for c in monthly.columns],
+            sa.select(
+                weather.c.station_id,
+                year,
+                month,
+                sa.func.count(),
+                sa.func.coalesce(sa.func.sum(weather.c.max_temp), 0),
+                sa.func.count(weather.c.max_temp),
+                sa.func.coalesce(sa.func.sum(weather.c.min_temp), 0),
+                sa.func.count(weather.c.min_temp),
+                sa.func.coalesce(sa.func.sum(weather.c.precipitation), 0),
+                sa.func.count(weather.c.precipitation),
+                sa.func.max(weather.c.max_temp),
+                sa.func.min(weather.c.min_temp),
+            ).group_by(weather.c.station_id, year, month),
+        )
+    )
+
+
+def downgrade():
+    op.drop_table("weather_monthly")
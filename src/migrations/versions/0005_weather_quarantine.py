@@ -0,0 +1,44 @@
+"""Quarantine table for rows rejected by ingestion validation
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Ingestion creates weather_quarantine, with the same index, on first use
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("weather_quarantine"):
+        op.create_table(
+            "weather_quarantine",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("source_path", sa.String(length=1024), nullable=False),
+            sa.Column("station_id", sa.String(length=50), nullable=False),
+            sa.Column("date", sa.Date(), nullable=False),
+            sa.Column("max_temp", sa.Integer()),
+            sa.Column("min_temp", sa.Integer()),
+            sa.Column("precipitation", sa.Integer()),
+            sa.Column("rule", sa.String(length=50), nullable=False),
+            sa.Column("quarantined_at", sa.DateTime(), nullable=False),
+        )
+    indexes = {i["name"] for i in inspector.get_indexes("weather_quarantine")}
+    if "ix_weather_quarantine_source_path" not in indexes:
+        op.create_index(
+            "ix_weather_quarantine_source_path", "weather_quarantine", ["source_path"]
+        )
+
+
+def downgrade():
+    op.drop_index("ix_weather_quarantine_source_path", table_name="weather_quarantine")
+    op.drop_table("weather_quarantine")
@@ -0,0 +1,35 @@
+"""Chunk checkpoints of partially loaded ingestion files
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Ingestion creates ingestion_checkpoint itself on first use
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("ingestion_checkpoint"):
+        op.create_table(
+            "ingestion_checkpoint",
+            sa.Column("path", sa.String(length=1024), primary_key=True),
+            sa.Column("content_hash", sa.String(length=64), nullable=False),
+            sa.Column("lines", sa.BigInteger(), nullable=False),
+            sa.Column("rows", sa.BigInteger(), nullable=False),
+            sa.Column("months", sa.Text(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table("ingestion_checkpoint")
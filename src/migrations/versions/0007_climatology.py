@@ -0,0 +1,68 @@
+"""Climatological normals, yearly anomalies and station records
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The climatology job creates these on first use
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("weather_normals"):
+        op.create_table(
+            "weather_normals",
+            sa.Column("station_id", sa.String(length=50), primary_key=True),
+            sa.Column("month", sa.Integer(), primary_key=True),
+            sa.Column("day", sa.Integer(), primary_key=True),
+            sa.Column("max_temp_normal", sa.Float()),
+            sa.Column("min_temp_normal", sa.Float()),
+            sa.Column("precipitation_normal", sa.Float()),
+            sa.Column("years", sa.Integer()),
+            sa.Column("record_max_temp", sa.Float()),
+            sa.Column("record_max_temp_year", sa.Integer()),
+            sa.Column("record_min_temp", sa.Float()),
+            sa.Column("record_min_temp_year", sa.Integer()),
+        )
+    if not inspector.has_table("weather_anomalies"):
+        op.create_table(
+            "weather_anomalies",
+            sa.Column("station_id", sa.String(length=50), primary_key=True),
+            sa.Column("year", sa.Integer(), primary_key=True),
+            sa.Column("days", sa.Integer()),
+            sa.Column("max_temp_anomaly", sa.Float()),
+            sa.Column("min_temp_anomaly", sa.Float()),
+            sa.Column("precipitation_anomaly", sa.Float()),
+        )
+    if not inspector.has_table("weather_records"):
+        op.create_table(
+            "weather_records",
+            sa.Column("station_id", sa.String(length=50), primary_key=True),
+            sa.Column("first_date", sa.Date()),
+            sa.Column("last_date", sa.Date()),
+            sa.Column("record_max_temp", sa.Float()),
+            sa.Column("record_max_temp_date", sa.Date()),
+            sa.Column("record_min_temp", sa.Float()),
+            sa.Column("record_min_temp_date", sa.Date()),
+            sa.Column("max_precipitation", sa.Float()),
+            sa.Column("max_precipitation_date", sa.Date()),
+            sa.Column("longest_dry_spell", sa.Integer()),
+            sa.Column("dry_spell_start", sa.Date()),
+            sa.Column("dry_spell_end", sa.Date()),
+        )
+
+
+def downgrade():
+    op.drop_table("weather_records")
+    op.drop_table("weather_anomalies")
+    op.drop_table("weather_normals")
@@ -0,0 +1,11 @@
+from app import db
+
+
+class CacheGeneration(db.Model):
+    """
+    Single-row counter bumped by ingestion and the stats job whenever they
+    write, invalidating cached API responses.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    generation = db.Column(db.BigInteger, nullable=False, default=0)
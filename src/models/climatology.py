@@ -0,0 +1,60 @@
+from app import db
+
+
+class WeatherNormals(db.Model):
+    """
+    Normals and records of one station for one calendar day, written by
+    analytics/climatology.py. Normals are means over the baseline years in
+    degrees Celsius and millimeters; records cover the station's full history.
+    """
+
+    __tablename__ = "weather_normals"
+
+    station_id = db.Column(db.String(50), primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Integer, primary_key=True)
+    max_temp_normal = db.Column(db.Float)
+    min_temp_normal = db.Column(db.Float)
+    precipitation_normal = db.Column(db.Float)
+    years = db.Column(db.Integer)
+    record_max_temp = db.Column(db.Float)
+    record_max_temp_year = db.Column(db.Integer)
+    record_min_temp = db.Column(db.Float)
+    record_min_temp_year = db.Column(db.Integer)
+
+
+class WeatherAnomaly(db.Model):
+    """
+    Mean daily temperature anomalies of a station-year against its normals,
+    and the precipitation anomaly of the year in centimeters.
+    """
+
+    __tablename__ = "weather_anomalies"
+
+    station_id = db.Column(db.String(50), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    days = db.Column(db.Integer)
+    max_temp_anomaly = db.Column(db.Float)
+    min_temp_anomaly = db.Column(db.Float)
+    precipitation_anomaly = db.Column(db.Float)
+
+
+class WeatherRecord(db.Model):
+    """
+    All-time extremes and longest dry spell of a station.
+    """
+
+    __tablename__ = "weather_records"
+
+    station_id = db.Column(db.String(50), primary_key=True)
+    first_date = db.Column(db.Date)
+    last_date = db.Column(db.Date)
+    record_max_temp = db.Column(db.Float)
+    record_max_temp_date = db.Column(db.Date)
+    record_min_temp = db.Column(db.Float)
+    record_min_temp_date = db.Column(db.Date)
+    max_precipitation = db.Column(db.Float)
+    max_precipitation_date = db.Column(db.Date)
+    longest_dry_spell = db.Column(db.Integer)
+    dry_spell_start = db.Column(db.Date)
+    dry_spell_end = db.Column(db.Date)
@@ -2,6 +2,13 @@ from app import db
 
 
 class WeatherData(db.Model):
+    __table_args__ = (
+        # Also serves the (station_id, date) lookups and keyset pagination
+        db.UniqueConstraint("station_id", "date", name="uq_weather_data_station_date"),
+        # Date-only range filters; BRIN stays tiny because rows arrive in date order
+        db.Index("ix_weather_data_date_brin", "date", postgresql_using="brin"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     station_id = db.Column(db.String(50), nullable=False)
     date = db.Column(db.Date, nullable=False)
@@ -0,0 +1,24 @@
+from app import db
+
+
+class WeatherMonthly(db.Model):
+    """
+    Additive per-station monthly aggregates maintained by ingestion. Sums and
+    counts are in the raw tenths of weather_data, so averages and totals of
+    any set of months are exact.
+    """
+
+    __tablename__ = "weather_monthly"
+
+    station_id = db.Column(db.String(50), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)
+    days = db.Column(db.BigInteger, nullable=False)
+    max_temp_sum = db.Column(db.BigInteger, nullable=False)
+    max_temp_count = db.Column(db.BigInteger, nullable=False)
+    min_temp_sum = db.Column(db.BigInteger, nullable=False)
+    min_temp_count = db.Column(db.BigInteger, nullable=False)
+    precipitation_sum = db.Column(db.BigInteger, nullable=False)
+    precipitation_count = db.Column(db.BigInteger, nullable=False)
+    max_temp_max = db.Column(db.Integer)
+    min_temp_min = db.Column(db.Integer)
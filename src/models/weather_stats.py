@@ -2,6 +2,10 @@ from app import db
 
 
 class WeatherStats(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint("station_id", "year", name="uq_weather_stats_station_year"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     station_id = db.Column(db.String(50), nullable=False)
     year = db.Column(db.Integer, nullable=False)
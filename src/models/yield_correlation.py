@@ -0,0 +1,35 @@
+from app import db
+
+
+class YieldWeatherYearly(db.Model):
+    """
+    National weather aggregates per year next to the corn yield, written by
+    analytics/yield_analytics.py.
+    """
+
+    __tablename__ = "yield_weather_yearly"
+
+    year = db.Column(db.Integer, primary_key=True)
+    stations = db.Column(db.Integer)
+    avg_max_temp = db.Column(db.Float)
+    avg_min_temp = db.Column(db.Float)
+    total_precipitation = db.Column(db.Float)
+    gs_avg_max_temp = db.Column(db.Float)
+    gs_avg_min_temp = db.Column(db.Float)
+    gs_precipitation = db.Column(db.Float)
+    yield_amount = db.Column(db.Float)
+
+
+class YieldCorrelation(db.Model):
+    """
+    Correlation and linear fit of the yield against one yearly weather feature.
+    """
+
+    __tablename__ = "yield_correlation"
+
+    feature = db.Column(db.String(50), primary_key=True)
+    n = db.Column(db.Integer)
+    r = db.Column(db.Float)
+    r_squared = db.Column(db.Float)
+    slope = db.Column(db.Float)
+    intercept = db.Column(db.Float)
@@ -0,0 +1,181 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline. Its function is called with the stage itself:
+    it can emit items for a stage streaming from it, and a streaming stage
+    reads the items of its source with batches().
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable,
+        after: tuple = (),
+        stream_from: Optional[str] = None,
+    ):
+        """
+        :param name: Unique name of the stage
+        :param run: Callable taking the Stage; its return value is the stage's result
+        :param after: Names of the stages that must succeed before this one starts
+        :param stream_from: Name of a stage whose emitted items this one consumes
+            while that stage is still running
+        """
+        self.name = name
+        self.run = run
+        self.after = tuple(after)
+        self.stream_from = stream_from
+        self.report = {"status": "pending"}
+        self._items = queue.Queue()
+        self._consumers = []
+        self._done = threading.Event()
+
+    def emit(self, item):
+        """
+        Hand an item to the stages streaming from this one.
+        """
+        emitted_at = time.perf_counter()
+        for consumer in self._consumers:
+            consumer._items.put((item, emitted_at))
+
+    def batches(self) -> Iterator[list]:
+        """
+        Yield the items emitted by the source stage as they arrive, grouped
+        into whatever accumulated while the previous batch was processed,
+        until the source has finished. Records in the report how long items
+        waited from their emission until their batch was processed.
+        """
+        lags = self.report.setdefault("lag_seconds", [])
+        finished = False
+        while not finished:
+            pending = [self._items.get()]
+            while True:
+                try:
+                    pending.append(self._items.get_nowait())
+                except queue.Empty:
+                    break
+            finished = pending[-1] is _DONE
+            batch = [entry for entry in pending if entry is not _DONE]
+            if not batch:
+                continue
+            yield [item for item, _ in batch]
+            done_at = time.perf_counter()
+            lags.extend(done_at - emitted_at for _, emitted_at in batch)
+
+
+class Pipeline:
+    """
+    Runs stages as a DAG, each in its own thread: a stage starts once every
+    stage in its `after` has succeeded, and is skipped if one of them failed
+    or was skipped. A streaming stage runs alongside its source, processing
+    each emitted item as soon as it is available.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+        # Setup logging
+        logging.basicConfig(
+            level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+        )
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def add(
+        self,
+        name: str,
+        run: Callable,
+        after: tuple = (),
+        stream_from: Optional[str] = None,
+    ) -> Stage:
+        """
+        :raises ValueError: On a duplicate name or an unknown dependency
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        for dependency in (*after, *([stream_from] if stream_from else [])):
+            if dependency not in self.stages:
+                raise ValueError(f"Stage {name} depends on unknown stage {dependency}")
+        stage = Stage(name, run, after, stream_from)
+        if stream_from:
+            self.stages[stream_from]._consumers.append(stage)
+        self.stages[name] = stage
+        return stage
+
+    def run(self) -> dict:
+        """
+        :return: Report per stage: status (succeeded, failed or skipped),
+            elapsed_seconds and the stage's result or error; streaming stages
+            also have items and max_lag_seconds, the longest time from an
+            item's emission until it was processed
+        """
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(
+                target=self._run_stage, args=(stage,), name=f"stage-{stage.name}"
+            )
+            for stage in self.stages.values()
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        reports = {name: stage.report for name, stage in self.stages.items()}
+        for report in reports.values():
+            lags = report.pop("lag_seconds", None)
+            if lags is not None:
+                report["items"] = len(lags)
+                report["max_lag_seconds"] = round(max(lags), 3) if lags else 0.0
+        self.logger.info(
+            f"Pipeline finished in {time.perf_counter() - started:.3f}s: "
+            + ", ".join(f"{name} {r['status']}" for name, r in reports.items())
+        )
+        return reports
+
+    @property
+    def succeeded(self) -> bool:
+        return all(
+            stage.report["status"] == "succeeded" for stage in self.stages.values()
+        )
+
+    def _run_stage(self, stage: Stage):
+        try:
+            for name in stage.after:
+                self.stages[name]._done.wait()
+            blocked = [
+                name
+                for name in stage.after
+                if self.stages[name].report["status"] != "succeeded"
+            ]
+            if blocked:
+                stage.report["status"] = "skipped"
+                self.logger.warning(
+                    f"Skipping stage {stage.name}: {', '.join(blocked)} did not succeed"
+                )
+                return
+
+            self.logger.info(f"Starting stage {stage.name}.")
+            stage.report["status"] = "running"
+            stage_started = time.perf_counter()
+            try:
+                stage.report["result"] = stage.run(stage)
+                stage.report["status"] = "succeeded"
+            except Exception as e:
+                stage.report["status"] = "failed"
+                stage.report["error"] = str(e)
+                self.logger.error(f"Stage {stage.name} failed: {e}")
+            stage.report["elapsed_seconds"] = round(
+                time.perf_counter() - stage_started, 3
+            )
+        finally:
+            # Consumers drain what was emitted, even if this stage failed
+            for consumer in stage._consumers:
+                consumer._items.put(_DONE)
+            stage._done.set()
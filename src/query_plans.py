@@ -0,0 +1,106 @@
+import json
+import sys
+from datetime import date
+
+from sqlalchemy import text, tuple_
+
+from app import create_app, db
+from models.weather_data import WeatherData
+from models.weather_stats import WeatherStats
+
+
+def api_queries():
+    """
+    :return: (name, query) pairs mirroring the filters issued by the controllers
+    """
+    return [
+        (
+            "weather by station and date",
+            WeatherData.query.filter_by(
+                station_id="USC00110072", date=date(1990, 1, 1)
+            ),
+        ),
+        (
+            "weather keyset page",
+            WeatherData.query.filter(
+                tuple_(WeatherData.station_id, WeatherData.date)
+                > ("USC00110072", date(1990, 1, 1))
+            )
+            .order_by(WeatherData.station_id, WeatherData.date)
+            .limit(11),
+        ),
+        (
+            "weather export range",
+            WeatherData.query.filter_by(station_id="USC00110072")
+            .filter(WeatherData.date >= date(1990, 1, 1))
+            .order_by(WeatherData.date),
+        ),
+        (
+            "weather by date",
+            WeatherData.query.filter_by(date=date(1990, 1, 1)),
+        ),
+        (
+            "stats by station and year",
+            WeatherStats.query.filter_by(station_id="USC00110072", year=1990),
+        ),
+        (
+            "stats batch",
+            WeatherStats.query.filter(
+                WeatherStats.station_id.in_(["USC00110072", "USC00110187"])
+            )
+            .filter(WeatherStats.year.between(1985, 2014))
+            .order_by(WeatherStats.station_id, WeatherStats.year),
+        ),
+    ]
+
+
+def find_seq_scans(plan: dict) -> list:
+    """
+    :param plan: Node of an EXPLAIN (FORMAT JSON) plan
+    :return: Relations read with a sequential scan anywhere in the plan
+    """
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child))
+    return found
+
+
+def check_query_plans(session) -> dict:
+    """
+    Explain every API query with sequential scans disabled. On small tables
+    the planner would rightly prefer a sequential scan, so this checks that
+    an index *can* serve each filter rather than which one is cheapest.
+    :param session: Session bound to a PostgreSQL database
+    :return: Query name -> relations that still need a sequential scan
+    """
+    failures = {}
+    session.execute(text("SET LOCAL enable_seqscan = off"))
+    for name, query in api_queries():
+        compiled = query.statement.compile(dialect=session.bind.dialect)
+        plan = (
+            session.connection()
+            .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+            .scalar()
+        )
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        seq_scans = find_seq_scans(plan[0]["Plan"])
+        if seq_scans:
+            failures[name] = seq_scans
+    session.rollback()
+    return failures
+
+
+if __name__ == "__main__":
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            sys.exit("Query plan checks need a PostgreSQL DATABASE_URL")
+        failures = check_query_plans(db.session)
+    for name, relations in failures.items():
+        print(f"FAIL {name}: sequential scan on {', '.join(relations)}")
+    if failures:
+        sys.exit(1)
+    print("All API queries can use an index.")
@@ -1,7 +1,21 @@
+from datetime import date as date_type
 from flask_restx import Namespace, Resource, fields
-from flask import request
-from controllers.weather_controller import get_weather_data
-from controllers.stats_controller import get_weather_stats
+from flask import Response, request, stream_with_context
+from cache import cached_response
+from controllers.weather_controller import (
+    decode_cursor,
+    export_weather_data,
+    get_weather_data,
+    get_weather_data_page,
+)
+from controllers.aggregation_controller import BUCKETS, aggregate_weather
+from controllers.climatology_controller import (
+    get_daily_anomalies,
+    get_weather_anomalies,
+    get_weather_normals,
+    get_weather_records,
+)
+from controllers.stats_controller import get_weather_stats, get_weather_stats_batch
 
 weather_bp = Namespace("weather", description="Weather data operations")
 
@@ -13,6 +27,15 @@ class Weather(Resource):
         "date", "Date in ISO format (YYYY-MM-DD)", type=str, required=True
     )
     @weather_bp.param("page", "Page number for pagination", type=int, default=1)
+    @weather_bp.param(
+        "cursor",
+        "Keyset pagination cursor; pass it empty for the first page, then the "
+        "returned next_cursor",
+        type=str,
+    )
+    @weather_bp.param(
+        "per_page", "Items per page with cursor pagination", type=int, default=10
+    )
     def get(self):
         """
         Get weather data by station_id and date.
@@ -20,9 +43,68 @@ class Weather(Resource):
         station_id = request.args.get("station_id")
         date = request.args.get("date")
         page = request.args.get("page", 1, type=int)
+        try:
+            date = date_type.fromisoformat(date) if date else None
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        if "cursor" in request.args:
+            cursor = request.args.get("cursor") or None
+            per_page = min(request.args.get("per_page", 10, type=int), 1000)
+            try:
+                if cursor:
+                    decode_cursor(cursor)
+            except ValueError as e:
+                return {"message": str(e)}, 400
+            return cached_response(
+                "weather_page",
+                {
+                    "station_id": station_id,
+                    "date": date,
+                    "cursor": cursor,
+                    "per_page": per_page,
+                },
+                lambda: get_weather_data_page(station_id, date, cursor, per_page),
+            )
 
-        data = get_weather_data(station_id, date, page)
-        return data, 200
+        return cached_response(
+            "weather",
+            {"station_id": station_id, "date": date, "page": page},
+            lambda: get_weather_data(station_id, date, page),
+        )
+
+
+@weather_bp.route("/export")
+class WeatherExport(Resource):
+    @weather_bp.param("station_id", "Station ID", type=str, required=True)
+    @weather_bp.param("start_date", "First date (YYYY-MM-DD), inclusive", type=str)
+    @weather_bp.param("end_date", "Last date (YYYY-MM-DD), inclusive", type=str)
+    @weather_bp.param(
+        "format", "ndjson or csv", type=str, default="ndjson", enum=["ndjson", "csv"]
+    )
+    def get(self):
+        """
+        Stream all weather data of a station as NDJSON or CSV.
+        """
+        station_id = request.args.get("station_id")
+        if not station_id:
+            return {"message": "station_id is required"}, 400
+        fmt = request.args.get("format", "ndjson")
+        try:
+            start_date, end_date = (
+                (
+                    date_type.fromisoformat(request.args[arg])
+                    if arg in request.args
+                    else None
+                )
+                for arg in ("start_date", "end_date")
+            )
+            chunks = export_weather_data(station_id, start_date, end_date, fmt)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        mimetype = "application/x-ndjson" if fmt == "ndjson" else "text/csv"
+        return Response(stream_with_context(chunks), mimetype=mimetype)
 
 
 @weather_bp.route("/stats")
@@ -38,5 +120,213 @@ class WeatherStats(Resource):
         year = request.args.get("year", type=int)
         page = request.args.get("page", 1, type=int)
 
-        data = get_weather_stats(station_id, year, page)
-        return data, 200
+        return cached_response(
+            "stats",
+            {"station_id": station_id, "year": year, "page": page},
+            lambda: get_weather_stats(station_id, year, page),
+        )
+
+
+def list_arg(name):
+    """
+    Accept both repeated (?a=1&a=2) and comma-separated (?a=1,2) list parameters.
+    """
+    return [v for value in request.args.getlist(name) for v in value.split(",") if v]
+
+
+@weather_bp.route("/stats/batch")
+class WeatherStatsBatch(Resource):
+    @weather_bp.param(
+        "station_id", "Station IDs, comma-separated or repeated", type=str
+    )
+    @weather_bp.param("start_year", "First year, inclusive", type=int)
+    @weather_bp.param("end_year", "Last year, inclusive", type=int)
+    @weather_bp.param(
+        "fields", "Statistics to return, comma-separated; all by default", type=str
+    )
+    @weather_bp.param(
+        "cursor", "next_cursor of the previous page; omit for the first page", type=str
+    )
+    def get(self):
+        """
+        Get weather statistics for many stations and years as one array per field.
+        """
+        station_ids = sorted(set(list_arg("station_id")))
+        start_year = request.args.get("start_year", type=int)
+        end_year = request.args.get("end_year", type=int)
+        fields = list_arg("fields")
+        cursor = request.args.get("cursor") or None
+        if not station_ids and not (start_year or end_year):
+            return {"message": "station_id or a year range is required"}, 400
+
+        try:
+            return cached_response(
+                "stats_batch",
+                {
+                    "station_id": station_ids,
+                    "start_year": start_year,
+                    "end_year": end_year,
+                    "fields": fields,
+                    "cursor": cursor,
+                },
+                lambda: get_weather_stats_batch(
+                    station_ids, start_year, end_year, fields, cursor
+                ),
+            )
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+
+@weather_bp.route("/aggregate")
+class WeatherAggregate(Resource):
+    @weather_bp.param(
+        "station_id",
+        "Station IDs, comma-separated or repeated",
+        type=str,
+        required=True,
+    )
+    @weather_bp.param(
+        "start_date", "First date (YYYY-MM-DD), inclusive", type=str, required=True
+    )
+    @weather_bp.param(
+        "end_date", "Last date (YYYY-MM-DD), inclusive", type=str, required=True
+    )
+    @weather_bp.param(
+        "bucket", "Aggregation period", type=str, default="month", enum=list(BUCKETS)
+    )
+    @weather_bp.param(
+        "metrics",
+        "Comma-separated: avg_max_temp, avg_min_temp, max_temp, min_temp, "
+        "total_precipitation, rolling_precipitation, days",
+        type=str,
+    )
+    @weather_bp.param("window", "Days of rolling_precipitation", type=int, default=7)
+    def get(self):
+        """
+        Aggregate daily weather per station into days, weeks, months, seasons or years.
+        """
+        station_ids = sorted(set(list_arg("station_id")))
+        bucket = request.args.get("bucket", "month")
+        metrics = list_arg("metrics")
+        window = request.args.get("window", 7, type=int)
+        if (
+            not station_ids
+            or "start_date" not in request.args
+            or "end_date" not in request.args
+        ):
+            return {"message": "station_id, start_date and end_date are required"}, 400
+        try:
+            start_date, end_date = (
+                date_type.fromisoformat(request.args[arg])
+                for arg in ("start_date", "end_date")
+            )
+            return cached_response(
+                "aggregate",
+                {
+                    "station_id": station_ids,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "bucket": bucket,
+                    "metrics": metrics,
+                    "window": window,
+                },
+                lambda: aggregate_weather(
+                    station_ids, start_date, end_date, bucket, metrics, window
+                ),
+            )
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+
+@weather_bp.route("/normals")
+class WeatherNormals(Resource):
+    @weather_bp.param("station_id", "Station ID", type=str, required=True)
+    @weather_bp.param("month", "Only the days of this month", type=int)
+    def get(self):
+        """
+        Get a station's normals and records per calendar day.
+        """
+        station_id = request.args.get("station_id")
+        month = request.args.get("month", type=int)
+        if not station_id:
+            return {"message": "station_id is required"}, 400
+
+        return cached_response(
+            "normals",
+            {"station_id": station_id, "month": month},
+            lambda: get_weather_normals(station_id, month),
+        )
+
+
+@weather_bp.route("/anomalies")
+class WeatherAnomalies(Resource):
+    @weather_bp.param("station_id", "Station ID", type=str, required=True)
+    @weather_bp.param("start_year", "First year, inclusive", type=int)
+    @weather_bp.param("end_year", "Last year, inclusive", type=int)
+    def get(self):
+        """
+        Get a station's yearly anomalies against its normals.
+        """
+        station_id = request.args.get("station_id")
+        start_year = request.args.get("start_year", type=int)
+        end_year = request.args.get("end_year", type=int)
+        if not station_id:
+            return {"message": "station_id is required"}, 400
+
+        return cached_response(
+            "anomalies",
+            {"station_id": station_id, "start_year": start_year, "end_year": end_year},
+            lambda: get_weather_anomalies(station_id, start_year, end_year),
+        )
+
+
+@weather_bp.route("/anomalies/daily")
+class WeatherDailyAnomalies(Resource):
+    @weather_bp.param("station_id", "Station ID", type=str, required=True)
+    @weather_bp.param("start_date", "First date (YYYY-MM-DD), inclusive", type=str)
+    @weather_bp.param("end_date", "Last date (YYYY-MM-DD), inclusive", type=str)
+    def get(self):
+        """
+        Get a station's daily anomalies against the normals of their calendar day.
+        """
+        station_id = request.args.get("station_id")
+        if not station_id:
+            return {"message": "station_id is required"}, 400
+        try:
+            start_date, end_date = (
+                (
+                    date_type.fromisoformat(request.args[arg])
+                    if arg in request.args
+                    else None
+                )
+                for arg in ("start_date", "end_date")
+            )
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        return cached_response(
+            "daily_anomalies",
+            {"station_id": station_id, "start_date": start_date, "end_date": end_date},
+            lambda: get_daily_anomalies(station_id, start_date, end_date),
+        )
+
+
+@weather_bp.route("/records")
+class WeatherRecords(Resource):
+    @weather_bp.param("station_id", "Station ID", type=str, required=True)
+    def get(self):
+        """
+        Get a station's all-time records and longest dry spell.
+        """
+        station_id = request.args.get("station_id")
+        if not station_id:
+            return {"message": "station_id is required"}, 400
+
+        response = cached_response(
+            "records",
+            {"station_id": station_id},
+            lambda: get_weather_records(station_id),
+        )
+        if isinstance(response, tuple) and response[0] is None:
+            return {"message": f"No records for station {station_id}"}, 404
+        return response
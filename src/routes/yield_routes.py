@@ -0,0 +1,33 @@
+from flask_restx import Namespace, Resource
+from flask import request
+from cache import cached_response
+from controllers.yield_controller import get_yield_correlation, get_yield_yearly
+
+yield_bp = Namespace("yield", description="Corn yield and weather correlation")
+
+
+@yield_bp.route("/correlation")
+class YieldCorrelation(Resource):
+    def get(self):
+        """
+        Get the correlation of the yearly corn yield with each weather feature.
+        """
+        return cached_response("yield_correlation", {}, get_yield_correlation)
+
+
+@yield_bp.route("/yearly")
+class YieldYearly(Resource):
+    @yield_bp.param("start_year", "First year, inclusive", type=int)
+    @yield_bp.param("end_year", "Last year, inclusive", type=int)
+    def get(self):
+        """
+        Get the national weather aggregates and the corn yield per year.
+        """
+        start_year = request.args.get("start_year", type=int)
+        end_year = request.args.get("end_year", type=int)
+
+        return cached_response(
+            "yield_yearly",
+            {"start_year": start_year, "end_year": end_year},
+            lambda: get_yield_yearly(start_year, end_year),
+        )
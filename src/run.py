@@ -1,8 +1,7 @@
-from app import create_app, db
+from app import create_app
 
+# The schema is created by the migrations (flask db upgrade), not on boot
 app = create_app()
 
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()  # Ensure the database is created
     app.run(debug=True)
@@ -0,0 +1,251 @@
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import date as date_type
+from typing import Iterator, Optional
+
+# Pointer file naming the snapshot readers should serve
+CURRENT = "CURRENT"
+READING_COLUMNS = ["max_temp", "min_temp", "precipitation"]
+EPOCH_ORDINAL = date_type(1970, 1, 1).toordinal()
+# Rows range reads from the mapped arrays at a time
+RANGE_BATCH_SIZE = 5000
+
+
+def write_snapshot(
+    engine, root: str, table_name: str = "weather_data", keep: int = 2
+) -> str:
+    """
+    Publish weather_data as a new snapshot for StationIndex: the rows sorted
+    by station and date, as days since 1970 (dates.npy) and readings in tenths
+    (readings.npy, int16 when every value fits), plus each station's row
+    range (stations.json). The snapshot is written to a directory of its own
+    and published by atomically replacing the CURRENT pointer, so readers
+    never see a partial snapshot.
+    :param engine: Engine of the database holding table_name
+    :param root: Directory of the snapshots
+    :param keep: Snapshots kept, including the new one; older ones are removed
+    :return: Name of the new snapshot
+    """
+    import numpy as np
+    import pandas as pd
+
+    df = pd.read_sql(
+        f"SELECT station_id, date, {', '.join(READING_COLUMNS)} FROM {table_name} "
+        "ORDER BY station_id, date",
+        engine,
+    )
+    dates = (
+        pd.to_datetime(df["date"]).to_numpy().astype("datetime64[D]").astype(np.int32)
+    )
+    readings = df[READING_COLUMNS].astype("Int64")
+    small = not (readings.abs() >= np.iinfo(np.int16).max).any().any()
+    dtype = np.int16 if small else np.int32
+    # The smallest value of the type stands for a missing reading
+    values = readings.fillna(np.iinfo(dtype).min).to_numpy(dtype=dtype)
+
+    station_ids = df["station_id"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, station_ids[1:] != station_ids[:-1]][: len(df)])
+    ends = [*starts[1:], len(df)]
+    stations = {
+        str(station_ids[start]): [int(start), int(end)]
+        for start, end in zip(starts, ends)
+    }
+
+    os.makedirs(root, exist_ok=True)
+    # Sortable by publication time, which pruning relies on
+    ns = time.time_ns()
+    name = (
+        f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(ns // 10**9))}.{ns % 10**9:09d}"
+    )
+    staging = os.path.join(root, f".{name}.tmp")
+    os.mkdir(staging)
+    np.save(os.path.join(staging, "dates.npy"), dates)
+    np.save(os.path.join(staging, "readings.npy"), values)
+    with open(os.path.join(staging, "stations.json"), "w") as f:
+        json.dump({"rows": len(df), "stations": stations}, f)
+    os.rename(staging, os.path.join(root, name))
+
+    pointer = os.path.join(root, f".{CURRENT}.{name}.tmp")
+    with open(pointer, "w") as f:
+        f.write(name)
+    os.replace(pointer, os.path.join(root, CURRENT))
+
+    # Workers still mapping a removed snapshot keep reading it until they refresh
+    older = sorted(
+        e
+        for e in os.listdir(root)
+        if not e.startswith(".") and e not in (CURRENT, name)
+    )
+    for old in older[: max(len(older) - (keep - 1), 0)]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return name
+
+
+class Snapshot:
+    """
+    One published snapshot, memory-mapped read-only: every worker process
+    serving it shares the same page cache pages.
+    """
+
+    def __init__(self, path: str):
+        import numpy as np
+
+        self.np = np
+        with open(os.path.join(path, "stations.json")) as f:
+            self.stations = json.load(f)["stations"]
+        self.dates = np.load(os.path.join(path, "dates.npy"), mmap_mode="r")
+        self.readings = np.load(os.path.join(path, "readings.npy"), mmap_mode="r")
+        self.missing = np.iinfo(self.readings.dtype).min
+
+    def rows(self, station_id: str, start: int, end: int) -> list:
+        """
+        :return: Rows start:end as serialize_weather_data expects them
+        """
+        readings = self.readings[start:end]
+        scaled = self.np.where(readings == self.missing, self.np.nan, readings / 10)
+        days = self.dates[start:end].astype("datetime64[D]").tolist()
+        return [
+            (station_id, day, *(None if value != value else value for value in values))
+            for day, values in zip(days, scaled.tolist())
+        ]
+
+    def arrays(self, station_id: str) -> tuple:
+        """
+        :return: The station's dates as days since 1970 and its readings in
+            tenths as floats, NaN where missing
+        :raises KeyError: If the station is not in the snapshot
+        """
+        start, end = self.stations[station_id]
+        readings = self.readings[start:end]
+        return (
+            self.dates[start:end].astype(self.np.int64),
+            self.np.where(
+                readings == self.missing, self.np.nan, readings.astype(float)
+            ),
+        )
+
+    def lookup(self, station_id: str, date) -> Optional[tuple]:
+        bounds = self.stations.get(station_id)
+        if bounds is None:
+            return None
+        start, end = bounds
+        day = date.toordinal() - EPOCH_ORDINAL
+        i = start + int(self.np.searchsorted(self.dates[start:end], day))
+        if i == end or self.dates[i] != day:
+            return None
+        return self.rows(station_id, i, i + 1)[0]
+
+    def range(
+        self,
+        station_id: str,
+        start_date=None,
+        end_date=None,
+        batch_size: int = RANGE_BATCH_SIZE,
+    ) -> Optional[Iterator[tuple]]:
+        bounds = self.stations.get(station_id)
+        if bounds is None:
+            return None
+        start, end = bounds
+        dates = self.dates[start:end]
+        first, last = 0, end - start
+        if start_date is not None:
+            first = int(
+                self.np.searchsorted(dates, start_date.toordinal() - EPOCH_ORDINAL)
+            )
+        if end_date is not None:
+            last = int(
+                self.np.searchsorted(
+                    dates, end_date.toordinal() - EPOCH_ORDINAL, side="right"
+                )
+            )
+        return self._iter_rows(
+            station_id, start + first, start + max(first, last), batch_size
+        )
+
+    def _iter_rows(
+        self, station_id: str, start: int, end: int, batch_size: int
+    ) -> Iterator[tuple]:
+        for offset in range(start, end, batch_size):
+            yield from self.rows(station_id, offset, min(offset + batch_size, end))
+
+
+class StationIndex:
+    """
+    Read-through index of weather_data for point and range lookups by
+    station, served from the latest snapshot published by write_snapshot.
+    Lookups return None when the snapshot cannot answer them (no snapshot,
+    unknown station, missing date), and the caller falls back to SQL.
+    """
+
+    def __init__(self, root: str, poll: float = 5, clock=time.monotonic):
+        """
+        :param root: Directory the snapshots are published to
+        :param poll: Seconds between checks of the CURRENT pointer
+        :param clock: Time source, overridable in tests
+        """
+        self.root = root
+        self.poll = poll
+        self.clock = clock
+        self.name = None
+        self._snapshot = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Optional[Snapshot]:
+        """
+        :return: The current snapshot, reloaded when a new one was published
+        """
+        now = self.clock()
+        if self._checked_at is not None and now - self._checked_at < self.poll:
+            return self._snapshot
+        with self._lock:
+            if self._checked_at is None or now - self._checked_at >= self.poll:
+                try:
+                    with open(os.path.join(self.root, CURRENT)) as f:
+                        name = f.read().strip()
+                    if name != self.name:
+                        # Swapped in one assignment; lookups in flight keep the old one
+                        self._snapshot = Snapshot(os.path.join(self.root, name))
+                        self.name = name
+                except OSError:
+                    pass
+                self._checked_at = now
+        return self._snapshot
+
+    def lookup(self, station_id: str, date) -> Optional[tuple]:
+        """
+        :return: (station_id, date, max_temp, min_temp, precipitation) in
+            degrees and millimeters, or None on a miss
+        """
+        snapshot = self.snapshot()
+        return None if snapshot is None else snapshot.lookup(station_id, date)
+
+    def range(
+        self,
+        station_id: str,
+        start_date=None,
+        end_date=None,
+        batch_size: int = RANGE_BATCH_SIZE,
+    ) -> Optional[Iterator[tuple]]:
+        """
+        :param batch_size: Rows read from the snapshot at a time
+        :return: Iterator over the station's rows between the dates,
+            inclusive, in date order, or None if the station is not in the
+            snapshot
+        """
+        snapshot = self.snapshot()
+        return (
+            None
+            if snapshot is None
+            else snapshot.range(station_id, start_date, end_date, batch_size)
+        )
+
+    @classmethod
+    def from_config(cls, config):
+        root = config.get("STATION_INDEX_DIR")
+        if not root:
+            return None
+        return cls(root, poll=config.get("STATION_INDEX_POLL", 5))
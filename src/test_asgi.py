@@ -0,0 +1,189 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from asgi import AsyncWeatherApi, async_database_url
+from config import Config, engine_options
+
+
+def call(app, path, query="", headers=(), method="GET"):
+    """
+    Send one request through the ASGI app.
+    :return: (status, headers, body)
+    """
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start, body = messages
+    return start["status"], dict(start["headers"]), body["body"]
+
+
+class TestAsyncWeatherApi(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        db_url = f"sqlite:///{os.path.join(self.tmp, 'weather.db')}"
+        engine = create_engine(db_url)
+        pd.DataFrame(
+            {
+                "id": [1, 2],
+                "station_id": ["ST001", "ST001"],
+                "date": pd.to_datetime(["2023-01-01", "2023-01-02"]).date,
+                "max_temp": [100, 0],
+                "min_temp": [-50, -100],
+                "precipitation": [5, None],
+            }
+        ).to_sql("weather_data", engine, index=False)
+        pd.DataFrame(
+            {
+                "id": [1],
+                "station_id": ["ST001"],
+                "year": [2023],
+                "avg_max_temp": [5.0],
+                "avg_min_temp": [-7.5],
+                "total_precipitation": [0.05],
+            }
+        ).to_sql("weather_stats", engine, index=False)
+        engine.dispose()
+
+        config = {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+        config["SQLALCHEMY_DATABASE_URI"] = db_url
+        self.app = AsyncWeatherApi(config)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_weather_by_station_and_date(self):
+        status, _, body = call(
+            self.app, "/api/weather/", "station_id=ST001&date=2023-01-01"
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)[0]["max_temp"], 10)
+
+    def test_weather_cursor_pages(self):
+        status, _, body = call(
+            self.app, "/api/weather", "station_id=ST001&cursor=&per_page=1"
+        )
+
+        self.assertEqual(status, 200)
+        page = json.loads(body)
+        self.assertEqual(len(page["items"]), 1)
+        self.assertIsNotNone(page["next_cursor"])
+
+    def test_invalid_date_is_rejected(self):
+        status, _, body = call(self.app, "/api/weather/", "date=2023-13-01")
+
+        self.assertEqual(status, 400)
+        self.assertIn(b"message", body)
+
+    def test_stats_with_etag(self):
+        status, headers, body = call(
+            self.app, "/api/weather/stats", "station_id=ST001&year=2023"
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)[0]["avg_min_temp"], -7.5)
+
+        status, _, body = call(
+            self.app,
+            "/api/weather/stats",
+            "year=2023&station_id=ST001",
+            headers=[("if-none-match", headers[b"etag"].decode())],
+        )
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b"")
+
+    def test_page_past_the_end_is_not_found(self):
+        status, _, _ = call(self.app, "/api/weather/stats", "page=2")
+
+        self.assertEqual(status, 404)
+
+    def test_head_sends_headers_only(self):
+        _, get_headers, get_body = call(
+            self.app, "/api/weather/stats", "station_id=ST001"
+        )
+        status, headers, body = call(
+            self.app, "/api/weather/stats", "station_id=ST001", method="HEAD"
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b"")
+        self.assertEqual(headers[b"etag"], get_headers[b"etag"])
+        self.assertEqual(headers[b"content-length"], str(len(get_body)).encode())
+
+    def test_cache_backend_runs_off_the_event_loop(self):
+        backend = self.app.cache.backend
+        threads = []
+
+        class RecordingBackend:
+            def get(self, key):
+                threads.append(threading.current_thread())
+                return backend.get(key)
+
+            def set(self, key, value):
+                threads.append(threading.current_thread())
+                backend.set(key, value)
+
+        self.app.cache.backend = RecordingBackend()
+        status, _, _ = call(self.app, "/api/weather/stats", "station_id=ST001")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.main_thread(), threads)
+
+
+class TestEngineOptions(unittest.TestCase):
+    def test_async_database_url(self):
+        self.assertEqual(
+            async_database_url("postgresql://u:p@db/weather"),
+            "postgresql+asyncpg://u:p@db/weather",
+        )
+        self.assertEqual(
+            async_database_url("sqlite:///w.db"), "sqlite+aiosqlite:///w.db"
+        )
+
+    def test_postgres_pool_and_statement_timeout(self):
+        config = {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+        config["SQLALCHEMY_DATABASE_URI"] = "postgresql://u:p@db/weather"
+
+        sync_options = engine_options(config)
+        async_options = engine_options(config, async_driver=True)
+
+        self.assertEqual(sync_options["pool_size"], Config.DB_POOL_SIZE)
+        self.assertTrue(sync_options["pool_pre_ping"])
+        self.assertEqual(
+            sync_options["connect_args"],
+            {"options": f"-c statement_timeout={Config.DB_STATEMENT_TIMEOUT_MS}"},
+        )
+        self.assertEqual(
+            async_options["connect_args"]["server_settings"]["statement_timeout"],
+            str(Config.DB_STATEMENT_TIMEOUT_MS),
+        )
+
+    def test_sqlite_keeps_defaults(self):
+        self.assertEqual(engine_options({"SQLALCHEMY_DATABASE_URI": "sqlite://"}), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
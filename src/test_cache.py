@@ -0,0 +1,106 @@
+import os
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import create_app
+from cache import InProcessBackend, ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestInProcessBackend(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        backend = InProcessBackend(max_entries=2)
+        backend.set("a", 1)
+        backend.set("b", 2)
+        backend.get("a")
+        backend.set("c", 3)
+
+        self.assertEqual(backend.get("a"), 1)
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual(backend.get("c"), 3)
+
+    def test_expires_after_ttl(self):
+        clock = FakeClock()
+        backend = InProcessBackend(ttl=10, clock=clock)
+        backend.set("a", 1)
+
+        clock.now = 9.9
+        self.assertEqual(backend.get("a"), 1)
+        clock.now = 10
+        self.assertIsNone(backend.get("a"))
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_key_ignores_parameter_order_and_missing_values(self):
+        cache = ResponseCache(InProcessBackend(), lambda: 1)
+
+        self.assertEqual(
+            cache.key("weather", {"station_id": "ST001", "date": None, "page": 1}),
+            cache.key("weather", {"page": 1, "station_id": "ST001"}),
+        )
+
+    def test_generation_bump_invalidates_entries(self):
+        clock = FakeClock()
+        generation = [1]
+        cache = ResponseCache(
+            InProcessBackend(), lambda: generation[0], generation_poll=5, clock=clock
+        )
+        computed = []
+
+        def compute():
+            computed.append(True)
+            return [len(computed)]
+
+        self.assertEqual(cache.get_or_compute("stats", {"year": 2024}, compute)[0], [1])
+        self.assertEqual(cache.get_or_compute("stats", {"year": 2024}, compute)[0], [1])
+
+        generation[0] = 2
+        self.assertEqual(cache.get_or_compute("stats", {"year": 2024}, compute)[0], [1])
+        clock.now = 5
+        self.assertEqual(cache.get_or_compute("stats", {"year": 2024}, compute)[0], [2])
+
+
+class TestCachedRoutes(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+    def test_repeated_request_is_served_from_cache_with_etag(self):
+        with patch(
+            "routes.weather_routes.get_weather_stats", return_value=[{"year": 2024}]
+        ) as mock_stats:
+            first = self.client.get("/api/weather/stats?station_id=ST001&year=2024")
+            second = self.client.get("/api/weather/stats?year=2024&station_id=ST001")
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.get_json(), [{"year": 2024}])
+        self.assertEqual(second.get_json(), [{"year": 2024}])
+        self.assertEqual(first.headers["ETag"], second.headers["ETag"])
+        mock_stats.assert_called_once_with("ST001", 2024, 1)
+
+    def test_matching_if_none_match_returns_304(self):
+        with patch(
+            "routes.weather_routes.get_weather_data", return_value=[]
+        ) as mock_data:
+            first = self.client.get("/api/weather/?station_id=ST001&date=2024-01-01")
+            second = self.client.get(
+                "/api/weather/?station_id=ST001&date=2024-01-01",
+                headers={"If-None-Match": first.headers["ETag"]},
+            )
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b"")
+        mock_data.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
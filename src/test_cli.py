@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from cli import main
+from station_index import StationIndex
+
+
+class TestBackfill(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.data_dir = os.path.join(self.workdir, "wx_data")
+        os.mkdir(self.data_dir)
+        for station_id, rows in {
+            "USC00000001": "19850101\t  -22\t -128\t   94\n"
+            "19860102\t -122\t -217\t    0\n",
+            "USC00000002": "19850101\t   10\t   -5\t-9999\n",
+        }.items():
+            with open(os.path.join(self.data_dir, f"{station_id}.txt"), "w") as f:
+                f.write(rows)
+        self.db_url = f"sqlite:///{os.path.join(self.workdir, 'weather.db')}"
+        self.reports = os.path.join(self.workdir, "reports")
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir)
+
+    def test_backfill_computes_stats_per_loaded_station(self):
+        status = main(
+            [
+                "backfill",
+                self.data_dir,
+                "--db-url",
+                self.db_url,
+                "--run-report-dir",
+                self.reports,
+            ]
+        )
+
+        self.assertEqual(status, 0)
+        stats = pd.read_sql(
+            "SELECT station_id, year FROM weather_stats ORDER BY station_id, year",
+            create_engine(self.db_url),
+        )
+        self.assertEqual(
+            list(stats.itertuples(index=False, name=None)),
+            [("USC00000001", 1985), ("USC00000001", 1986), ("USC00000002", 1985)],
+        )
+        with open(os.path.join(self.reports, "backfill.json")) as f:
+            report = json.load(f)
+        self.assertEqual(report["stations_streamed"], 2)
+        self.assertEqual(set(report["stages"]), {"ingest", "station_stats", "stats"})
+        # Every partition was recomputed as its station was loaded
+        with open(os.path.join(self.reports, "weather_stats.json")) as f:
+            self.assertEqual(json.load(f)["partitions"], 0)
+
+    def test_backfill_from_archive_uses_member_station_ids(self):
+        archive_path = os.path.join(self.workdir, "wx_data.tar.gz")
+        with tarfile.open(archive_path, "w:gz") as archive:
+            for name in sorted(os.listdir(self.data_dir)):
+                archive.add(os.path.join(self.data_dir, name), arcname=name)
+
+        status = main(
+            [
+                "backfill",
+                archive_path,
+                "--db-url",
+                self.db_url,
+                "--run-report-dir",
+                self.reports,
+            ]
+        )
+
+        self.assertEqual(status, 0)
+        stats = pd.read_sql(
+            "SELECT station_id, year FROM weather_stats ORDER BY station_id, year",
+            create_engine(self.db_url),
+        )
+        self.assertEqual(
+            list(stats.itertuples(index=False, name=None)),
+            [("USC00000001", 1985), ("USC00000001", 1986), ("USC00000002", 1985)],
+        )
+        # The streamed stations found their partitions, none were left over
+        with open(os.path.join(self.reports, "weather_stats.json")) as f:
+            self.assertEqual(json.load(f)["partitions"], 0)
+
+    def test_backfill_publishes_station_index(self):
+        index_dir = os.path.join(self.workdir, "index")
+        status = main(
+            [
+                "backfill",
+                self.data_dir,
+                "--db-url",
+                self.db_url,
+                "--index-dir",
+                index_dir,
+                "--run-report-dir",
+                self.reports,
+            ]
+        )
+
+        self.assertEqual(status, 0)
+        index = StationIndex(index_dir)
+        self.assertEqual(
+            index.lookup("USC00000001", date(1986, 1, 2)),
+            ("USC00000001", date(1986, 1, 2), -12.2, -21.7, 0.0),
+        )
+        with open(os.path.join(self.reports, "backfill.json")) as f:
+            self.assertIn("publish_index", json.load(f)["stages"])
+
+    def test_ingest_without_files_fails(self):
+        status = main(
+            ["ingest", os.path.join(self.workdir, "missing"), "--db-url", self.db_url]
+        )
+
+        self.assertEqual(status, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from sqlalchemy import create_engine, select
+
+from jobs import bump_cache_generation, cache_generation
+
+
+class TestBumpCacheGeneration(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.workdir, 'weather.db')}"
+        )
+        cache_generation.create(self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.workdir)
+
+    def generation(self):
+        with self.engine.connect() as conn:
+            return conn.execute(select(cache_generation.c.generation)).scalars().all()
+
+    def test_first_bump_inserts_the_row(self):
+        bump_cache_generation(self.engine)
+        bump_cache_generation(self.engine)
+
+        self.assertEqual(self.generation(), [2])
+
+    def test_concurrent_bumps_all_count(self):
+        def bump():
+            for _ in range(5):
+                bump_cache_generation(self.engine)
+
+        threads = [threading.Thread(target=bump) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.generation(), [20])
+
+
+if __name__ == "__main__":
+    unittest.main()
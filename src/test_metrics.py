@@ -0,0 +1,99 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import text
+
+from app import create_app, db
+from metrics import Histogram, Metrics
+
+
+class TestHistogram(unittest.TestCase):
+    def test_renders_cumulative_buckets(self):
+        histogram = Histogram(
+            "latency_seconds", "Latency.", ("method",), buckets=(0.1, 1)
+        )
+        histogram.observe(0.05, "GET")
+        histogram.observe(0.5, "GET")
+        histogram.observe(5, "GET")
+
+        self.assertEqual(
+            histogram.render()[2:],
+            [
+                'latency_seconds_bucket{method="GET",le="0.1"} 1',
+                'latency_seconds_bucket{method="GET",le="1"} 2',
+                'latency_seconds_bucket{method="GET",le="+Inf"} 3',
+                'latency_seconds_sum{method="GET"} 5.55',
+                'latency_seconds_count{method="GET"} 3',
+            ],
+        )
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.reports = tempfile.mkdtemp()
+        with open(os.path.join(self.reports, "ingestion.json"), "w") as f:
+            json.dump(
+                {
+                    "job": "ingestion",
+                    "rows_read": 5,
+                    "files_skipped": 1,
+                    "stages": {"parse": 0.25},
+                    "quality": {},
+                    "elapsed_seconds": 1.5,
+                    "finished_at": 1700000000.0,
+                },
+                f,
+            )
+        self.app = create_app()
+        self.app.extensions["metrics"].run_report_dir = self.reports
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.reports)
+
+    def test_exports_request_and_query_timings(self):
+        self.client.get("/api/weather/missing")
+        with self.app.app_context():
+            db.session.execute(text("SELECT 1"))
+            db.session.remove()
+
+        response = self.client.get("/metrics")
+        body = response.get_data(as_text=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain; version=0.0.4"))
+        self.assertIn(
+            'weather_api_request_duration_seconds_count{method="GET",'
+            'endpoint="unmatched",status="404"} 1',
+            body,
+        )
+        self.assertIn(
+            'weather_db_query_duration_seconds_count{operation="SELECT"} 1', body
+        )
+
+    def test_exports_latest_batch_run_reports(self):
+        body = self.app.extensions["metrics"].render()
+
+        self.assertIn(
+            'weather_batch_count{job="ingestion",counter="rows_read"} 5', body
+        )
+        self.assertIn(
+            'weather_batch_count{job="ingestion",counter="files_skipped"} 1', body
+        )
+        self.assertIn(
+            'weather_batch_stage_seconds{job="ingestion",stage="parse"} 0.25', body
+        )
+        self.assertIn('weather_batch_duration_seconds{job="ingestion"} 1.5', body)
+        self.assertNotIn("quality", body)
+
+    def test_metrics_without_reports(self):
+        self.assertNotIn("weather_batch", Metrics().render())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import threading
+import unittest
+
+from pipeline import Pipeline
+
+
+class TestPipeline(unittest.TestCase):
+    def test_stages_run_after_their_dependencies(self):
+        order = []
+        pipeline = Pipeline()
+        pipeline.add("extract", lambda stage: order.append("extract") or 1)
+        pipeline.add(
+            "load", lambda stage: order.append("load") or 2, after=("extract",)
+        )
+        pipeline.add("report", lambda stage: order.append("report"), after=("load",))
+
+        reports = pipeline.run()
+
+        self.assertEqual(order, ["extract", "load", "report"])
+        self.assertEqual(reports["load"]["status"], "succeeded")
+        self.assertEqual(reports["load"]["result"], 2)
+        self.assertTrue(pipeline.succeeded)
+
+    def test_failed_stage_skips_its_dependents(self):
+        def fail(stage):
+            raise RuntimeError("boom")
+
+        pipeline = Pipeline()
+        pipeline.add("extract", fail)
+        pipeline.add("load", lambda stage: None, after=("extract",))
+        pipeline.add("report", lambda stage: None, after=("load",))
+
+        reports = pipeline.run()
+
+        self.assertEqual(reports["extract"]["status"], "failed")
+        self.assertEqual(reports["extract"]["error"], "boom")
+        self.assertEqual(reports["load"]["status"], "skipped")
+        self.assertEqual(reports["report"]["status"], "skipped")
+        self.assertFalse(pipeline.succeeded)
+
+    def test_streaming_stage_consumes_items_while_source_runs(self):
+        consumed = threading.Event()
+        seen = []
+
+        def produce(stage):
+            stage.emit("USC00000001")
+            # Only returns once the consumer has handled the first item
+            if not consumed.wait(5):
+                raise RuntimeError("the item was not consumed while producing")
+            stage.emit("USC00000002")
+            stage.emit("USC00000003")
+
+        def consume(stage):
+            for batch in stage.batches():
+                seen.extend(batch)
+                consumed.set()
+            return len(seen)
+
+        pipeline = Pipeline()
+        pipeline.add("ingest", produce)
+        pipeline.add("stats", consume, stream_from="ingest")
+
+        reports = pipeline.run()
+
+        self.assertTrue(pipeline.succeeded)
+        self.assertEqual(seen, ["USC00000001", "USC00000002", "USC00000003"])
+        self.assertEqual(reports["stats"]["items"], 3)
+        self.assertGreaterEqual(reports["stats"]["max_lag_seconds"], 0)
+
+    def test_unknown_dependency_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Pipeline().add("load", lambda stage: None, after=("extract",))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import unittest
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import create_app, db
+from query_plans import check_query_plans, find_seq_scans
+
+
+class TestFindSeqScans(unittest.TestCase):
+    def test_finds_nested_seq_scans(self):
+        plan = {
+            "Node Type": "Limit",
+            "Plans": [
+                {
+                    "Node Type": "Nested Loop",
+                    "Plans": [
+                        {"Node Type": "Index Scan", "Relation Name": "weather_data"},
+                        {"Node Type": "Seq Scan", "Relation Name": "weather_stats"},
+                    ],
+                }
+            ],
+        }
+
+        self.assertEqual(find_seq_scans(plan), ["weather_stats"])
+
+    def test_index_only_plan_has_no_seq_scans(self):
+        plan = {"Node Type": "Bitmap Heap Scan", "Relation Name": "weather_data"}
+
+        self.assertEqual(find_seq_scans(plan), [])
+
+
+@unittest.skipUnless(
+    os.environ["DATABASE_URL"].startswith("postgresql"),
+    "query plan checks need a migrated PostgreSQL database",
+)
+class TestApiQueryPlans(unittest.TestCase):
+    def test_api_filters_use_an_index(self):
+        app = create_app()
+        with app.app_context():
+            self.assertEqual(check_query_plans(db.session), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
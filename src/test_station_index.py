@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from station_index import CURRENT, StationIndex, write_snapshot
+
+
+def load(engine, rows):
+    pd.DataFrame(
+        rows, columns=["station_id", "date", "max_temp", "min_temp", "precipitation"]
+    ).to_sql("weather_data", engine, if_exists="replace", index=False)
+
+
+class TestStationIndex(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.root = os.path.join(self.workdir, "index")
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.workdir, 'weather.db')}"
+        )
+        load(
+            self.engine,
+            [
+                ("USC00000002", "1985-01-01", 10, -5, None),
+                ("USC00000001", "1985-01-02", -122, -217, 0),
+                ("USC00000001", "1985-01-01", -22, -128, 94),
+                ("USC00000001", "1985-01-05", 300, 150, 12),
+            ],
+        )
+        self.now = 0.0
+        self.index = StationIndex(self.root, poll=5, clock=lambda: self.now)
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir)
+
+    def test_lookup_without_snapshot_misses(self):
+        self.assertIsNone(self.index.lookup("USC00000001", date(1985, 1, 1)))
+
+    def test_lookup_returns_readings_in_degrees(self):
+        write_snapshot(self.engine, self.root)
+
+        self.assertEqual(
+            self.index.lookup("USC00000001", date(1985, 1, 1)),
+            ("USC00000001", date(1985, 1, 1), -2.2, -12.8, 9.4),
+        )
+        self.assertEqual(
+            self.index.lookup("USC00000002", date(1985, 1, 1)),
+            ("USC00000002", date(1985, 1, 1), 1.0, -0.5, None),
+        )
+        self.assertIsNone(self.index.lookup("USC00000001", date(1985, 1, 3)))
+        self.assertIsNone(self.index.lookup("USC00000003", date(1985, 1, 1)))
+
+    def test_range_is_inclusive_and_ordered(self):
+        write_snapshot(self.engine, self.root)
+
+        rows = self.index.range("USC00000001", date(1985, 1, 2), date(1985, 1, 5))
+
+        self.assertEqual([row[1] for row in rows], [date(1985, 1, 2), date(1985, 1, 5)])
+        self.assertEqual(len(list(self.index.range("USC00000001"))), 3)
+        self.assertEqual(list(self.index.range("USC00000001", date(1986, 1, 1))), [])
+        self.assertIsNone(self.index.range("USC00000003"))
+        self.assertEqual(
+            list(self.index.range("USC00000001", batch_size=2)),
+            list(self.index.range("USC00000001")),
+        )
+
+    def test_new_snapshot_is_picked_up_after_poll_interval(self):
+        write_snapshot(self.engine, self.root)
+        self.assertIsNone(self.index.lookup("USC00000003", date(1985, 1, 1)))
+        load(self.engine, [("USC00000003", "1985-01-01", 50, 20, 0)])
+        first = self.index.name
+
+        write_snapshot(self.engine, self.root)
+        self.assertIsNone(self.index.lookup("USC00000003", date(1985, 1, 1)))
+        self.now += 5
+
+        self.assertEqual(
+            self.index.lookup("USC00000003", date(1985, 1, 1)),
+            ("USC00000003", date(1985, 1, 1), 5.0, 2.0, 0.0),
+        )
+        self.assertNotEqual(self.index.name, first)
+
+    def test_old_snapshots_are_pruned(self):
+        names = [write_snapshot(self.engine, self.root) for _ in range(3)]
+
+        with open(os.path.join(self.root, CURRENT)) as f:
+            self.assertEqual(f.read(), names[-1])
+        self.assertEqual(sorted(os.listdir(self.root)), sorted([CURRENT, *names[1:]]))
+
+
+if __name__ == "__main__":
+    unittest.main()